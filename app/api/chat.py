@@ -2,17 +2,79 @@
 Chat Endpoint
 Handles user queries and returns AI responses using RAG
 """
-from fastapi import APIRouter, HTTPException
-from app.schemas.chat_schema import ChatRequest, ChatResponse
-from app.services.rag_chain import get_rag_chain
+from typing import AsyncIterator, Iterator, List, Optional
+import anyio
+import orjson
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from app.api.dependencies import rag_chain_dependency
+from app.schemas.chat_schema import ChatRequest, ChatResponse, SourceDocument
+from app.services.rag_chain import RAGChainService
+from app.services.response_cache import get_response_cache
+from app.core.config import get_settings
+from app.utils.concurrency import get_chat_limiter
 from app.utils.logger import get_logger
 
 router = APIRouter()
 logger = get_logger(__name__)
+settings = get_settings()
+
+# Returned by next() once the token iterator is exhausted
+_STREAM_END = object()
+
+
+def _answer(request: ChatRequest, rag_chain: RAGChainService) -> ChatResponse:
+    """
+    Answer a chat request (blocking: embeds, retrieves and calls the LLM)
+    
+    Args:
+        request: ChatRequest with query, optional session_id and chat_history
+        rag_chain: RAG chain service
+        
+    Returns:
+        ChatResponse with answer and source documents
+    """
+    # Only stateless queries are cacheable; history changes the answer
+    query_vector = None
+    if settings.semantic_cache_enabled and not request.session_id and not request.chat_history:
+        response_cache = get_response_cache()
+        # Read before answering, so an answer racing an ingest or delete is not cached
+        revision = response_cache.vectorstore_manager.revision
+        query_vector = response_cache.embed_query(request.query)
+        cached = response_cache.lookup(query_vector)
+        if cached is not None:
+            answer, sources = cached
+            return ChatResponse(answer=answer, sources=sources, session_id=request.session_id)
+    
+    # If session_id provided and no chat_history, use persistent memory
+    if request.session_id and not request.chat_history:
+        answer, sources = rag_chain.query_with_memory(
+            question=request.query,
+            session_id=request.session_id
+        )
+    else:
+        # Use provided chat history
+        answer, sources = rag_chain.query(
+            question=request.query,
+            session_id=request.session_id,
+            chat_history=request.chat_history
+        )
+    
+    if query_vector is not None:
+        response_cache.store(query_vector, answer, sources, revision)
+    
+    return ChatResponse(
+        answer=answer,
+        sources=sources,
+        session_id=request.session_id
+    )
 
 
 @router.post("/chat", response_model=ChatResponse)
-async def chat(request: ChatRequest):
+async def chat(
+    request: ChatRequest,
+    rag_chain: RAGChainService = Depends(rag_chain_dependency)
+):
     """
     Chat endpoint - Answer user questions using RAG
     
@@ -25,26 +87,13 @@ async def chat(request: ChatRequest):
     try:
         logger.info(f"Received chat request: {request.query[:100]}...")
         
-        rag_chain = get_rag_chain()
-        
-        # If session_id provided and no chat_history, use persistent memory
-        if request.session_id and not request.chat_history:
-            answer, sources = rag_chain.query_with_memory(
-                question=request.query,
-                session_id=request.session_id
-            )
-        else:
-            # Use provided chat history
-            answer, sources = rag_chain.query(
-                question=request.query,
-                session_id=request.session_id,
-                chat_history=request.chat_history
-            )
-        
-        response = ChatResponse(
-            answer=answer,
-            sources=sources,
-            session_id=request.session_id
+        # Retrieval and generation block; run them on the chat thread pool so
+        # the event loop keeps serving other requests meanwhile
+        response = await anyio.to_thread.run_sync(
+            _answer,
+            request,
+            rag_chain,
+            limiter=get_chat_limiter()
         )
         
         logger.info(f"Chat response generated successfully")
@@ -56,3 +105,70 @@ async def chat(request: ChatRequest):
             status_code=500,
             detail=f"Error processing chat request: {str(e)}"
         )
+
+
+async def _stream_events(
+    sources: List[SourceDocument],
+    tokens: Iterator[str],
+    session_id: Optional[str]
+) -> AsyncIterator[bytes]:
+    """
+    Encode a streamed answer as newline-delimited JSON events
+    
+    Emits {"sources": [...]} first, then one {"token": "..."} per answer token,
+    and finally {"done": true, "session_id": ...} (or {"error": "..."}).
+    """
+    yield orjson.dumps({"sources": [source.model_dump() for source in sources]}) + b"\n"
+    
+    try:
+        while True:
+            # Each token blocks on the LLM; pull it on the chat thread pool
+            token = await anyio.to_thread.run_sync(next, tokens, _STREAM_END, limiter=get_chat_limiter())
+            if token is _STREAM_END:
+                break
+            yield orjson.dumps({"token": token}) + b"\n"
+    except Exception as e:
+        logger.error(f"Error streaming chat response: {e}")
+        yield orjson.dumps({"error": str(e)}) + b"\n"
+        return
+    
+    yield orjson.dumps({"done": True, "session_id": session_id}) + b"\n"
+
+
+@router.post("/chat/stream")
+async def chat_stream(
+    request: ChatRequest,
+    rag_chain: RAGChainService = Depends(rag_chain_dependency)
+):
+    """
+    Streaming chat endpoint - Answer user questions using RAG, token by token
+    
+    Args:
+        request: ChatRequest with query, optional session_id and chat_history
+        
+    Returns:
+        application/x-ndjson stream: a sources event, token events, then a done event
+    """
+    try:
+        logger.info(f"Received streaming chat request: {request.query[:100]}...")
+        
+        # Retrieval runs before the response starts so errors still map to a 500
+        sources, tokens = await anyio.to_thread.run_sync(
+            rag_chain.stream_query,
+            request.query,
+            request.session_id,
+            request.chat_history,
+            limiter=get_chat_limiter()
+        )
+        
+    except Exception as e:
+        logger.error(f"Error processing streaming chat request: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error processing chat request: {str(e)}"
+        )
+    
+    return StreamingResponse(
+        _stream_events(sources, tokens, request.session_id),
+        media_type="application/x-ndjson"
+    )
@@ -0,0 +1,58 @@
+"""
+API Dependencies
+Provide service singletons that are resolved once at startup and bound to app.state
+"""
+from typing import Any, Callable
+from fastapi import Request
+from app.core.vectorstore import VectorStoreManager, get_vectorstore_manager
+from app.services.document_loader import DocumentLoaderService, get_document_loader
+from app.services.document_monitor import DocumentMonitor, get_document_monitor
+from app.services.ingest_jobs import IngestJobManager, get_ingest_job_manager
+from app.services.rag_chain import RAGChainService, get_rag_chain
+from app.services.web_scraper import WebScraperService, get_web_scraper
+
+
+def _from_app_state(request: Request, name: str, factory: Callable[[], Any]) -> Any:
+    """
+    Read a service from app.state, resolving and binding it on first use
+    
+    Services are normally bound during application startup; the fallback
+    covers ones that failed to initialize there (e.g. a missing API key).
+    """
+    service = getattr(request.app.state, name, None)
+    
+    if service is None:
+        service = factory()
+        setattr(request.app.state, name, service)
+    
+    return service
+
+
+def rag_chain_dependency(request: Request) -> RAGChainService:
+    """Get the RAGChainService bound at startup"""
+    return _from_app_state(request, "rag_chain", get_rag_chain)
+
+
+def vectorstore_manager_dependency(request: Request) -> VectorStoreManager:
+    """Get the VectorStoreManager bound at startup"""
+    return _from_app_state(request, "vectorstore_manager", get_vectorstore_manager)
+
+
+def document_loader_dependency(request: Request) -> DocumentLoaderService:
+    """Get the DocumentLoaderService bound at startup"""
+    return _from_app_state(request, "document_loader", get_document_loader)
+
+
+def document_monitor_dependency(request: Request) -> DocumentMonitor:
+    """Get the DocumentMonitor bound at startup"""
+    return _from_app_state(request, "document_monitor", get_document_monitor)
+
+
+def web_scraper_dependency(request: Request) -> WebScraperService:
+    """Get the WebScraperService bound at startup"""
+    return _from_app_state(request, "web_scraper", get_web_scraper)
+
+
+def ingest_job_manager_dependency(request: Request) -> IngestJobManager:
+    """Get the IngestJobManager bound at startup"""
+    return _from_app_state(request, "ingest_job_manager", get_ingest_job_manager)
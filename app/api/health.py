@@ -1,25 +1,72 @@
 """
 Health Check Endpoint
 """
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import ORJSONResponse
 from datetime import datetime
+from typing import Any, Dict, Optional
+from app.api.dependencies import document_monitor_dependency, ingest_job_manager_dependency
 from app.core.config import get_settings
+from app.services.document_monitor import DocumentMonitor
+from app.services.ingest_jobs import IngestJobManager
 
 router = APIRouter()
 
+# Settings are immutable for the lifetime of the process; resolve them once
+settings = get_settings()
+
+
+def _get_startup_ingest_job(request: Request, job_manager: IngestJobManager) -> Optional[Dict[str, Any]]:
+    """Get the job processing the documents folder at startup, if one was started"""
+    job_id = getattr(request.app.state, "startup_ingest_job_id", None)
+    return job_manager.get(job_id) if job_id else None
+
 
 @router.get("/health")
-async def health_check():
+async def health_check(
+    request: Request,
+    job_manager: IngestJobManager = Depends(ingest_job_manager_dependency)
+):
     """
     Health check endpoint
-    Returns API status and basic information
+    Returns API status and basic information (503 "starting" until the
+    model warmup and the startup documents folder ingest have finished)
     """
-    settings = get_settings()
+    if not getattr(request.app.state, "ready", False):
+        return ORJSONResponse(
+            status_code=503,
+            content={"status": "starting", "ready": False, "service": settings.app_name}
+        )
+    
+    job = _get_startup_ingest_job(request, job_manager)
     
     return {
         "status": "healthy",
+        "ready": True,
+        "ingest": job["status"] if job else "not_started",
         "service": settings.app_name,
         "version": settings.app_version,
         "timestamp": datetime.utcnow().isoformat(),
         "model": settings.model_name
     }
+
+
+@router.get("/health/ingest-status")
+async def ingest_status(
+    request: Request,
+    job_manager: IngestJobManager = Depends(ingest_job_manager_dependency),
+    monitor: DocumentMonitor = Depends(document_monitor_dependency)
+):
+    """
+    Status of the documents folder ingestion started at application startup
+    
+    Returns:
+        Job status ("running", "completed" or "failed") with its result or error,
+        and how many of the folder's files have been loaded so far
+    """
+    job = _get_startup_ingest_job(request, job_manager)
+    
+    if job is None:
+        return {"status": "not_started"}
+    
+    return {**job, "progress": monitor.progress}
@@ -2,22 +2,144 @@
 Document and URL Ingestion Endpoints
 Handles uploading documents and scraping web content
 """
-from typing import List
-from fastapi import APIRouter, UploadFile, File, HTTPException
-from app.schemas.ingest_schema import URLIngestRequest, IngestResponse
-from app.services.document_loader import get_document_loader
-from app.services.web_scraper import get_web_scraper
-from app.services.document_monitor import get_document_monitor
-from app.core.vectorstore import get_vectorstore_manager
+import asyncio
+import hashlib
+import os
+import shutil
+import tempfile
+import weakref
+from pathlib import Path
+from typing import BinaryIO, List
+import anyio
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Query
+from fastapi.responses import ORJSONResponse
+from langchain_core.documents import Document
+from app.schemas.ingest_schema import URLIngestRequest, IngestResponse, IngestJobResponse
+from app.api.dependencies import (
+    document_monitor_dependency,
+    ingest_job_manager_dependency,
+    vectorstore_manager_dependency,
+    web_scraper_dependency
+)
+from app.services.document_loader import (
+    chunk_documents_in_worker,
+    get_chunk_pool,
+    process_uploaded_path_in_worker
+)
+from app.services.web_scraper import WebScraperService
+from app.services.document_monitor import DocumentMonitor
+from app.services.ingest_jobs import IngestJobManager
+from app.core.vectorstore import VectorStoreManager
 from app.core.config import get_settings
+from app.utils.concurrency import get_ingest_limiter
 from app.utils.logger import get_logger
 
 router = APIRouter()
 logger = get_logger(__name__)
+settings = get_settings()
 
+# File types accepted by the upload endpoint
+ALLOWED_EXTENSIONS = frozenset({".pdf", ".docx", ".doc", ".txt"})
 
-@router.post("/ingest/docs", response_model=IngestResponse)
-async def ingest_documents(files: List[UploadFile] = File(...)):
+# Uploads are copied to disk in slices of this size (1 MB)
+UPLOAD_READ_CHUNK_SIZE = 1 << 20
+
+# One lock per URL being ingested; entries disappear once no ingest holds them
+_url_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+
+def _get_url_lock(url: str) -> asyncio.Lock:
+    """Get the lock that serializes ingests of one URL"""
+    lock = _url_locks.get(url)
+    if lock is None:
+        lock = asyncio.Lock()
+        _url_locks[url] = lock
+    return lock
+
+
+def _copy_to_temp_file(source: BinaryIO, suffix: str) -> str:
+    """
+    Copy a file object to a new temporary file on disk (blocking)
+    
+    Args:
+        source: File object to copy from its current position
+        suffix: Suffix for the temporary file name (e.g. ".pdf")
+        
+    Returns:
+        Path of the temporary file (caller is responsible for deleting it)
+    """
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as temp_file:
+        try:
+            shutil.copyfileobj(source, temp_file, UPLOAD_READ_CHUNK_SIZE)
+        except Exception:
+            temp_file.close()
+            _remove_temp_file(temp_file.name)
+            raise
+        return temp_file.name
+
+
+async def _spool_upload_to_disk(file: UploadFile) -> str:
+    """
+    Stream an uploaded file to a temporary file on disk
+    
+    The copy runs on a worker thread in one pass, so large uploads never
+    block the event loop with file writes.
+    
+    Args:
+        file: Uploaded file
+        
+    Returns:
+        Path of the temporary file (caller is responsible for deleting it)
+    """
+    await file.seek(0)
+    return await asyncio.to_thread(_copy_to_temp_file, file.file, Path(file.filename).suffix)
+
+
+def _remove_temp_file(temp_file_path: str):
+    """Delete a temporary upload file, logging instead of raising on failure"""
+    try:
+        Path(temp_file_path).unlink(missing_ok=True)
+    except Exception as e:
+        logger.warning(f"Could not delete temporary file: {e}")
+
+
+async def _process_upload(file: UploadFile) -> List[Document]:
+    """
+    Spool a single upload to disk and chunk it in the chunking process pool
+    
+    Args:
+        file: Uploaded file
+        
+    Returns:
+        List of chunked Document objects
+    """
+    logger.info(f"Processing file: {file.filename}")
+    
+    # Stream file content to disk instead of buffering it in memory
+    temp_file_path = await _spool_upload_to_disk(file)
+    
+    # Release the upload's own spooled buffer now rather than when the request ends
+    await file.close()
+    
+    # Parse and chunk in a worker process: the work is GIL-bound Python, so
+    # this keeps the event loop responsive and uses all cores across files
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            get_chunk_pool(),
+            process_uploaded_path_in_worker,
+            temp_file_path,
+            file.filename
+        )
+    finally:
+        await asyncio.to_thread(_remove_temp_file, temp_file_path)
+
+
+@router.post("/ingest/docs", response_model=IngestResponse, response_model_exclude_none=True)
+async def ingest_documents(
+    files: List[UploadFile] = File(...),
+    vectorstore_manager: VectorStoreManager = Depends(vectorstore_manager_dependency)
+):
     """
     Ingest documents (PDF, DOCX, TXT) into the vector store
     
@@ -31,40 +153,36 @@ async def ingest_documents(files: List[UploadFile] = File(...)):
         logger.info(f"Received {len(files)} files for ingestion")
         
         # Validate file types
-        allowed_extensions = {".pdf", ".docx", ".doc", ".txt"}
-        
-        for file in files:
-            file_ext = "." + file.filename.split(".")[-1].lower() if "." in file.filename else ""
-            if file_ext not in allowed_extensions:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"File type not supported: {file.filename}. Allowed: PDF, DOCX, TXT"
-                )
+        unsupported = [
+            file.filename for file in files
+            if os.path.splitext(file.filename or "")[1].lower() not in ALLOWED_EXTENSIONS
+        ]
+        if unsupported:
+            raise HTTPException(
+                status_code=400,
+                detail=f"File type not supported: {', '.join(unsupported)}. Allowed: PDF, DOCX, TXT"
+            )
         
         # Process files
-        document_loader = get_document_loader()
-        vectorstore_manager = get_vectorstore_manager()
-        
         all_chunks = []
         source_names = []
         
-        for file in files:
-            try:
-                logger.info(f"Processing file: {file.filename}")
-                
-                # Read file content
-                content = await file.read()
-                
-                # Process and chunk the document
-                chunks = document_loader.process_uploaded_file(content, file.filename)
-                all_chunks.extend(chunks)
-                source_names.append(file.filename)
-                
-                logger.info(f"Created {len(chunks)} chunks from {file.filename}")
-                
-            except Exception as e:
-                logger.error(f"Error processing file {file.filename}: {e}")
+        # Process all files concurrently
+        results = await asyncio.gather(
+            *(_process_upload(file) for file in files),
+            return_exceptions=True
+        )
+        
+        for file, result in zip(files, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error processing file {file.filename}: {result}")
                 # Continue with other files
+                continue
+            
+            all_chunks.extend(result)
+            source_names.append(file.filename)
+            
+            logger.info(f"Created {len(result)} chunks from {file.filename}")
         
         if not all_chunks:
             raise HTTPException(
@@ -73,14 +191,15 @@ async def ingest_documents(files: List[UploadFile] = File(...)):
             )
         
         # Add to vector store
-        num_added = vectorstore_manager.add_documents(all_chunks)
+        num_added = await vectorstore_manager.aadd_documents(all_chunks)
         
         response = IngestResponse(
             status="success",
             message=f"Successfully ingested {len(files)} document(s)",
             documents_processed=len(files),
             chunks_created=num_added,
-            sources=source_names
+            sources=source_names[:settings.max_sources_in_response],
+            total_sources=len(source_names)
         )
         
         logger.info(f"Ingestion complete: {num_added} chunks added to vector store")
@@ -96,8 +215,10 @@ async def ingest_documents(files: List[UploadFile] = File(...)):
         )
 
 
-@router.post("/ingest/folder", response_model=IngestResponse)
-async def ingest_from_folder():
+@router.post("/ingest/folder", response_model=IngestResponse, response_model_exclude_none=True)
+async def ingest_from_folder(
+    monitor: DocumentMonitor = Depends(document_monitor_dependency)
+):
     """
     Process only new or modified documents from the configured documents folder
     (Automatically tracks which files have been processed)
@@ -106,19 +227,22 @@ async def ingest_from_folder():
         IngestResponse with processing status and statistics
     """
     try:
-        settings = get_settings()
         logger.info(f"Checking for new/modified documents in: {settings.documents_folder}")
         
-        # Use document monitor for intelligent processing
-        monitor = get_document_monitor()
-        result = monitor.process_new_documents()
+        # Use document monitor for intelligent processing (on a worker thread,
+        # since it may wait for the startup scan to finish)
+        result = await anyio.to_thread.run_sync(
+            monitor.process_new_documents,
+            limiter=get_ingest_limiter()
+        )
         
         response = IngestResponse(
             status=result['status'],
             message=result['message'],
             documents_processed=result['documents_processed'],
             chunks_created=result['chunks_created'],
-            sources=result['files']
+            sources=result['files'][:settings.max_sources_in_response],
+            total_sources=len(result['files'])
         )
         
         return response
@@ -132,12 +256,13 @@ async def ingest_from_folder():
 
 
 @router.post("/ingest/folder/reset")
-async def reset_folder_tracking():
+async def reset_folder_tracking(
+    monitor: DocumentMonitor = Depends(document_monitor_dependency)
+):
     """
     Reset document tracking (forces reprocessing of all documents on next ingest)
     """
     try:
-        monitor = get_document_monitor()
         monitor.reset_tracking()
         
         logger.info("Document tracking reset")
@@ -154,51 +279,160 @@ async def reset_folder_tracking():
         )
 
 
-@router.post("/ingest/url", response_model=IngestResponse)
-async def ingest_url(request: URLIngestRequest):
+@router.delete("/ingest/source")
+async def delete_source(
+    source: str = Query(..., description="Source to remove, e.g. a URL or an uploaded file name"),
+    vectorstore_manager: VectorStoreManager = Depends(vectorstore_manager_dependency)
+):
     """
-    Scrape and ingest content from a URL
+    Remove every chunk ingested from a source (e.g. a URL or an uploaded file)
     
     Args:
-        request: URLIngestRequest with the URL to scrape
+        source: Source identifier as shown in chat sources
         
     Returns:
-        IngestResponse with processing status and statistics
+        Status and number of chunks deleted
     """
     try:
-        url = str(request.url)
-        logger.info(f"Received URL for ingestion: {url}")
-        
-        # Scrape the URL
-        web_scraper = get_web_scraper()
-        documents = web_scraper.scrape_url(url)
+        # Wait for any ingest of the same URL so its chunks are removed too
+        async with _get_url_lock(source):
+            num_deleted = await asyncio.to_thread(vectorstore_manager.delete_by_source, source)
+    except Exception as e:
+        logger.error(f"Error deleting source {source}: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error deleting source: {str(e)}"
+        )
+    
+    if not num_deleted:
+        raise HTTPException(
+            status_code=404,
+            detail=f"No ingested content found for source: {source}"
+        )
+    
+    logger.info(f"Deleted {num_deleted} chunks for source: {source}")
+    return {
+        "status": "success",
+        "message": f"Removed content from {source}",
+        "chunks_deleted": num_deleted
+    }
+
+
+async def _ingest_url_content(
+    url: str,
+    web_scraper: WebScraperService,
+    vectorstore_manager: VectorStoreManager
+) -> IngestResponse:
+    """
+    Scrape a URL, chunk its content and add the chunks to the vector store
+    
+    Ingests of the same URL run one at a time from the hash check to the
+    removal of outdated chunks, so concurrent requests cannot both add a
+    new version of the page or skip each other's stale chunks.
+    
+    Args:
+        url: URL to scrape
+        web_scraper: Web scraper service
+        vectorstore_manager: Vector store to write to
         
-        if not documents:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Could not scrape content from URL: {url}"
+    Returns:
+        IngestResponse with processing status and statistics
+    """
+    # Scrape the URL (blocking network I/O) on the ingestion thread pool
+    documents = await anyio.to_thread.run_sync(
+        web_scraper.scrape_url,
+        url,
+        limiter=get_ingest_limiter()
+    )
+    
+    if not documents:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Could not scrape content from URL: {url}"
+        )
+    
+    # Skip re-embedding pages whose content has not changed since the last ingest
+    content_hash = hashlib.sha256(
+        "\n".join(doc.page_content for doc in documents).encode("utf-8")
+    ).hexdigest()
+    
+    async with _get_url_lock(url):
+        previous_hash = vectorstore_manager.get_source_hash(url)
+        if previous_hash == content_hash:
+            logger.info(f"Content unchanged since last ingestion, skipping: {url}")
+            return IngestResponse(
+                status="skipped",
+                message="Content unchanged since last ingestion",
+                documents_processed=0,
+                chunks_created=0,
+                sources=[url]
             )
         
-        # Chunk the documents
-        document_loader = get_document_loader()
-        chunks = document_loader.chunk_documents(documents)
+        # Chunk the documents in the chunking process pool to keep the event loop free
+        loop = asyncio.get_running_loop()
+        chunks = await loop.run_in_executor(get_chunk_pool(), chunk_documents_in_worker, documents)
         
         logger.info(f"Created {len(chunks)} chunks from URL content")
         
+        # Chunks from a previous version of this page are replaced, not duplicated
+        stale_ids = vectorstore_manager.get_source_ids(url) if previous_hash else set()
+        
         # Add to vector store
-        vectorstore_manager = get_vectorstore_manager()
-        num_added = vectorstore_manager.add_documents(chunks)
+        num_added = await vectorstore_manager.aadd_documents(chunks)
+        vectorstore_manager.set_source_hash(url, content_hash)
         
-        response = IngestResponse(
-            status="success",
-            message=f"Successfully ingested content from URL",
-            documents_processed=1,
-            chunks_created=num_added,
-            sources=[url]
-        )
+        if stale_ids:
+            logger.info(f"Removing {len(stale_ids)} outdated chunks for {url}")
+            await asyncio.to_thread(vectorstore_manager.delete_documents, stale_ids)
         
-        logger.info(f"URL ingestion complete: {num_added} chunks added")
-        return response
+    logger.info(f"URL ingestion complete: {num_added} chunks added")
+    return IngestResponse(
+        status="success",
+        message=f"Successfully ingested content from URL",
+        documents_processed=1,
+        chunks_created=num_added,
+        sources=[url]
+    )
+
+
+@router.post(
+    "/ingest/url",
+    response_model=IngestResponse,
+    response_model_exclude_none=True,
+    responses={202: {"model": IngestJobResponse}}
+)
+async def ingest_url(
+    request: URLIngestRequest,
+    web_scraper: WebScraperService = Depends(web_scraper_dependency),
+    vectorstore_manager: VectorStoreManager = Depends(vectorstore_manager_dependency),
+    job_manager: IngestJobManager = Depends(ingest_job_manager_dependency)
+):
+    """
+    Scrape and ingest content from a URL
+    
+    With `async_mode` the ingestion runs in the background and the endpoint
+    returns 202 with a job ID to poll at /ingest/jobs/{job_id}.
+    
+    Args:
+        request: URLIngestRequest with the URL to scrape
+        
+    Returns:
+        IngestResponse with processing status and statistics
+    """
+    try:
+        url = str(request.url)
+        logger.info(f"Received URL for ingestion: {url}")
+        
+        if request.async_mode:
+            job_id = job_manager.submit(
+                _ingest_url_content(url, web_scraper, vectorstore_manager)
+            )
+            return ORJSONResponse(
+                status_code=202,
+                content=IngestJobResponse(**job_manager.get(job_id)).model_dump(exclude_none=True)
+            )
+        
+        return await _ingest_url_content(url, web_scraper, vectorstore_manager)
         
     except HTTPException:
         raise
@@ -208,3 +442,32 @@ async def ingest_url(request: URLIngestRequest):
             status_code=500,
             detail=f"Error processing URL: {str(e)}"
         )
+
+
+@router.get(
+    "/ingest/jobs/{job_id}",
+    response_model=IngestJobResponse,
+    response_model_exclude_none=True
+)
+async def get_ingest_job(
+    job_id: str,
+    job_manager: IngestJobManager = Depends(ingest_job_manager_dependency)
+):
+    """
+    Get the status of a background ingestion job
+    
+    Args:
+        job_id: Job ID returned by an async ingestion request
+        
+    Returns:
+        IngestJobResponse with the job status and, once finished, its result
+    """
+    job = job_manager.get(job_id)
+    
+    if job is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Ingestion job not found: {job_id}"
+        )
+    
+    return IngestJobResponse(**job)
@@ -3,9 +3,13 @@ Configuration Management
 Handles all environment variables and application settings using Pydantic BaseSettings
 """
 import os
+from functools import lru_cache
 from typing import Optional
 from pydantic_settings import BaseSettings
-from pydantic import Field
+from pydantic import Field, field_validator
+
+# index_factory components that may precede the IVF layer (vector transforms)
+INDEX_FACTORY_PRETRANSFORMS = ("OPQ", "PCA", "RR", "ITQ", "L2norm")
 
 
 class Settings(BaseSettings):
@@ -35,6 +39,10 @@ class Settings(BaseSettings):
         default="sentence-transformers/all-MiniLM-L6-v2",
         description="HuggingFace embedding model"
     )
+    huggingface_embeddings_endpoint: Optional[str] = Field(
+        default=None,
+        description="URL of a Text Embeddings Inference (TEI) server; used instead of loading the embedding model in-process"
+    )
     
     # Hugging Face LLM Configuration
     use_huggingface_llm: bool = Field(
@@ -45,6 +53,10 @@ class Settings(BaseSettings):
         default="mistralai/Mistral-7B-Instruct-v0.1",
         description="HuggingFace LLM model"
     )
+    huggingface_llm_endpoint: Optional[str] = Field(
+        default=None,
+        description="URL of a Text Generation Inference (TGI) server; used instead of loading the LLM in-process"
+    )
     huggingface_api_token: Optional[str] = Field(
         default=None,
         description="Hugging Face API token (for private models)"
@@ -53,18 +65,85 @@ class Settings(BaseSettings):
         default="D:/HuggingFace/cache",
         description="Hugging Face cache directory path"
     )
+    huggingface_quantization: Optional[str] = Field(
+        default=None,
+        description="Load the Hugging Face LLM quantized on GPU: '4bit' (NF4) or '8bit' (requires bitsandbytes)"
+    )
+    huggingface_attn_implementation: Optional[str] = Field(
+        default=None,
+        description="Attention implementation for the Hugging Face LLM, e.g. 'flash_attention_2' or 'sdpa'"
+    )
     
     # Vector Store Configuration
     faiss_index_path: str = Field(
         default="app/data/faiss_index",
         description="Path to FAISS index storage"
     )
+    faiss_index_factory: Optional[str] = Field(
+        default=None,
+        description=(
+            "FAISS index_factory string for new indexes: 'Flat' or an IVF index such as 'IVF4096,SQ8', "
+            "'IVF4096,PQ32x8' or 'OPQ32_256,IVF4096,PQ32' (default: exact flat index)"
+        )
+    )
+    faiss_nprobe: int = Field(
+        default=16,
+        description="Number of inverted lists probed per search on IVF indexes"
+    )
+    faiss_mmap: bool = Field(
+        default=False,
+        description="Serve flat vectors and IVF lists from a read-only memory map of the FAISS index instead of copying them into RAM (reloaded into RAM on first write)"
+    )
+    faiss_ondisk_invlists: bool = Field(
+        default=False,
+        description=(
+            "Save IVF inverted lists to a separate .ivfdata file that is memory-mapped on load instead of held in RAM. "
+            "Only helps read-only replicas: the first write after startup copies every list back into RAM, "
+            "and each save rewrites the whole .ivfdata file"
+        )
+    )
+    faiss_flush_interval: float = Field(
+        default=30.0,
+        description="Seconds between background saves of index changes; 0 saves after every write"
+    )
     documents_folder: str = Field(
         default="documents",
         description="Folder path for documents to be processed"
     )
     chunk_size: int = Field(default=1000, description="Text chunk size")
     chunk_overlap: int = Field(default=200, description="Text chunk overlap")
+    chunk_workers: Optional[int] = Field(
+        default=None,
+        description="Worker processes for parsing/chunking uploads (default: CPU count)"
+    )
+    ingest_workers: Optional[int] = Field(
+        default=None,
+        description="Threads running blocking ingestion work such as URL scraping (default: CPU count)"
+    )
+    ingest_batch_size: int = Field(
+        default=256,
+        description="Number of chunks embedded per vector store batch during ingestion"
+    )
+    embed_batch_size: int = Field(
+        default=256,
+        description="Maximum number of texts sent to the embedding model per call"
+    )
+    huggingface_embed_batch_size: int = Field(
+        default=64,
+        description="Batch size used by local HuggingFace embedding models when encoding texts"
+    )
+    query_embedding_cache_size: int = Field(
+        default=1024,
+        description="Number of recent query embeddings kept in memory (0 disables the cache)"
+    )
+    ingest_concurrency: int = Field(
+        default=4,
+        description="Maximum number of ingestion batches embedded concurrently"
+    )
+    max_sources_in_response: int = Field(
+        default=50,
+        description="Maximum number of source names listed in an ingestion response"
+    )
     
     # RAG Configuration
     retrieval_k: int = Field(default=4, description="Number of documents to retrieve")
@@ -73,6 +152,29 @@ class Settings(BaseSettings):
         description="Allow AI to use general knowledge when documents don't contain the answer"
     )
     
+    chat_workers: Optional[int] = Field(
+        default=None,
+        description="Threads running blocking chat work (retrieval and LLM calls) (default: CPU count)"
+    )
+    
+    # Semantic Response Cache Configuration
+    semantic_cache_enabled: bool = Field(
+        default=False,
+        description="Reuse answers for stateless queries that are semantically equivalent to a cached one"
+    )
+    semantic_cache_threshold: float = Field(
+        default=0.95,
+        description="Minimum cosine similarity between queries for a cache hit"
+    )
+    semantic_cache_ttl: int = Field(
+        default=3600,
+        description="Seconds a cached answer stays valid"
+    )
+    semantic_cache_max_entries: int = Field(
+        default=1000,
+        description="Maximum number of cached answers"
+    )
+    
     # CORS Configuration
     cors_origins: list = Field(
         default=["*"],
@@ -84,6 +186,10 @@ class Settings(BaseSettings):
         default=False,
         description="Run in API-only mode (no UI serving)"
     )
+    warmup_on_startup: bool = Field(
+        default=True,
+        description="Run a warmup pass through the embedding model (and local Hugging Face LLM) at startup"
+    )
     
     # Server Configuration
     host: str = Field(default="0.0.0.0", description="Server host")
@@ -96,16 +202,41 @@ class Settings(BaseSettings):
         description="Azure Storage connection string for persistent storage"
     )
     
+    @field_validator("faiss_index_factory")
+    @classmethod
+    def validate_index_factory(cls, value: Optional[str]) -> Optional[str]:
+        """
+        Accept only index types whose ids the vector store keeps in sync on add and delete
+        
+        Flat indexes are numbered by position and IVF indexes by explicit ids;
+        others (e.g. IDMap, HNSW) reject those adds or deletes.
+        """
+        if value is None or not value.strip():
+            return None
+        
+        components = [component.strip() for component in value.split(",")]
+        is_ivf = (
+            len(components) >= 2
+            and components[-2].startswith("IVF")
+            and all(component.startswith(INDEX_FACTORY_PRETRANSFORMS) for component in components[:-2])
+        )
+        
+        if components != ["Flat"] and not is_ivf:
+            raise ValueError(
+                f"Unsupported FAISS_INDEX_FACTORY '{value}': use 'Flat' or an IVF index "
+                f"such as 'IVF4096,SQ8' (optionally after a transform like 'OPQ32_256')"
+            )
+        
+        return ",".join(components)
+    
     class Config:
         env_file = ".env"
         case_sensitive = False
         extra = "allow"
 
 
-# Global settings instance
-settings = Settings()
-
-
+# Settings are parsed once and shared as a process-wide singleton
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
-    """Get application settings instance"""
-    return settings
+    """Get application settings instance (parsed from the environment once)"""
+    return Settings()
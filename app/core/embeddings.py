@@ -2,7 +2,10 @@
 Embeddings Configuration
 Manages OpenAI and HuggingFace embeddings initialization
 """
-from typing import Union
+from functools import lru_cache
+from typing import List, Union
+import numpy as np
+from langchain_core.embeddings import Embeddings
 from langchain_openai import OpenAIEmbeddings
 from langchain_community.embeddings import HuggingFaceEmbeddings
 from app.core.config import get_settings
@@ -11,7 +14,52 @@ from app.utils.logger import get_logger
 logger = get_logger(__name__)
 
 
-def get_embeddings() -> Union[OpenAIEmbeddings, HuggingFaceEmbeddings]:
+class QueryCachedEmbeddings(Embeddings):
+    """Embeddings wrapper that keeps recent query embeddings in an LRU cache"""
+    
+    def __init__(self, embeddings: Embeddings, maxsize: int):
+        self.embeddings = embeddings
+        self._embed_query_cached = lru_cache(maxsize=maxsize)(self._embed_query_bytes)
+    
+    def _embed_query_bytes(self, text: str) -> bytes:
+        """Embed a query and pack it as float32 bytes (4 bytes per dimension in the cache)"""
+        return np.asarray(self.embeddings.embed_query(text), dtype=np.float32).tobytes()
+    
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed documents (not cached)"""
+        return self.embeddings.embed_documents(texts)
+    
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a query, reusing the vector if the same text was embedded recently"""
+        return np.frombuffer(self._embed_query_cached(text), dtype=np.float32).tolist()
+    
+    def __getattr__(self, name):
+        # Expose provider-specific attributes (model name, client, ...)
+        if name == "embeddings":
+            raise AttributeError(name)
+        return getattr(self.embeddings, name)
+
+
+@lru_cache(maxsize=1)
+def get_embeddings() -> Embeddings:
+    """
+    Get the shared embeddings model
+    Repeated query texts (e.g. the cache lookup and retrieval for the same
+    chat question) are embedded once when `query_embedding_cache_size` > 0
+    
+    Returns:
+        Embeddings instance (OpenAI or HuggingFace)
+    """
+    embeddings = _create_embeddings()
+    cache_size = get_settings().query_embedding_cache_size
+    
+    if cache_size > 0:
+        return QueryCachedEmbeddings(embeddings, cache_size)
+    
+    return embeddings
+
+
+def _create_embeddings() -> Union[OpenAIEmbeddings, HuggingFaceEmbeddings]:
     """
     Initialize and return embeddings model
     Tries OpenAI first, falls back to HuggingFace if configured
@@ -22,13 +70,32 @@ def get_embeddings() -> Union[OpenAIEmbeddings, HuggingFaceEmbeddings]:
     settings = get_settings()
     
     try:
-        if settings.use_huggingface_embeddings:
+        if settings.use_huggingface_embeddings and settings.huggingface_embeddings_endpoint:
+            logger.info(f"Using HuggingFace TEI endpoint: {settings.huggingface_embeddings_endpoint}")
+            
+            try:
+                from langchain_huggingface import HuggingFaceEndpointEmbeddings
+            except ImportError as ie:
+                logger.error(f"HuggingFace endpoint client not installed: {ie}")
+                logger.info("Run: pip install langchain-huggingface")
+                raise
+            
+            embeddings = HuggingFaceEndpointEmbeddings(
+                model=settings.huggingface_embeddings_endpoint,
+                huggingfacehub_api_token=settings.huggingface_api_token
+            )
+            logger.info("HuggingFace TEI embeddings initialized successfully")
+            return embeddings
+        elif settings.use_huggingface_embeddings:
             logger.info(f"Initializing HuggingFace embeddings: {settings.huggingface_model_name}")
             embeddings = HuggingFaceEmbeddings(
                 model_name=settings.huggingface_model_name,
                 cache_folder=settings.huggingface_cache_dir,
                 model_kwargs={'device': 'cpu'},
-                encode_kwargs={'normalize_embeddings': True}
+                encode_kwargs={
+                    'batch_size': settings.huggingface_embed_batch_size,
+                    'normalize_embeddings': True
+                }
             )
             logger.info("HuggingFace embeddings initialized successfully")
             return embeddings
@@ -36,7 +103,8 @@ def get_embeddings() -> Union[OpenAIEmbeddings, HuggingFaceEmbeddings]:
             logger.info(f"Initializing OpenAI embeddings: {settings.embedding_model}")
             embeddings = OpenAIEmbeddings(
                 model=settings.embedding_model,
-                openai_api_key=settings.openai_api_key
+                openai_api_key=settings.openai_api_key,
+                chunk_size=settings.embed_batch_size
             )
             logger.info("OpenAI embeddings initialized successfully")
             return embeddings
@@ -52,7 +120,10 @@ def get_embeddings() -> Union[OpenAIEmbeddings, HuggingFaceEmbeddings]:
                     cache_folder=settings.huggingface_cache_dir,
                     model_name=settings.huggingface_model_name,
                     model_kwargs={'device': 'cpu'},
-                    encode_kwargs={'normalize_embeddings': True}
+                    encode_kwargs={
+                        'batch_size': settings.huggingface_embed_batch_size,
+                        'normalize_embeddings': True
+                    }
                 )
                 logger.info("HuggingFace embeddings (fallback) initialized successfully")
                 return embeddings
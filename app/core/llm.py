@@ -2,6 +2,7 @@
 LLM Configuration and Initialization
 Manages OpenAI and Hugging Face LLM instances with proper configuration
 """
+from functools import lru_cache
 from typing import Union
 from langchain_openai import ChatOpenAI
 from app.core.config import get_settings
@@ -10,10 +11,13 @@ from app.utils.logger import get_logger
 logger = get_logger(__name__)
 
 
+@lru_cache(maxsize=1)
 def get_llm() -> Union[ChatOpenAI, any]:
     """
     Initialize and return LLM instance (OpenAI or Hugging Face)
     
+    The instance is cached, so Hugging Face weights are loaded only once per process.
+    
     Returns:
         Configured LLM instance
     """
@@ -21,7 +25,29 @@ def get_llm() -> Union[ChatOpenAI, any]:
     
     try:
         # Use Hugging Face if configured
-        if settings.use_huggingface_llm:
+        if settings.use_huggingface_llm and settings.huggingface_llm_endpoint:
+            logger.info(f"Using Hugging Face TGI endpoint: {settings.huggingface_llm_endpoint}")
+            
+            try:
+                from langchain_huggingface import HuggingFaceEndpoint
+            except ImportError as ie:
+                logger.error(f"Hugging Face endpoint client not installed: {ie}")
+                logger.info("Run: pip install langchain-huggingface")
+                raise
+            
+            # Generation runs on the TGI server, which batches requests across workers
+            llm = HuggingFaceEndpoint(
+                endpoint_url=settings.huggingface_llm_endpoint,
+                max_new_tokens=512,
+                do_sample=settings.temperature > 0,
+                temperature=settings.temperature if settings.temperature > 0 else None,
+                top_p=0.95 if settings.temperature > 0 else None,
+                huggingfacehub_api_token=settings.huggingface_api_token
+            )
+            logger.info("Hugging Face TGI endpoint initialized successfully")
+            return llm
+        
+        elif settings.use_huggingface_llm:
             logger.info(f"Initializing Hugging Face LLM: {settings.huggingface_llm_model}")
             
             try:
@@ -33,6 +59,36 @@ def get_llm() -> Union[ChatOpenAI, any]:
                 device = "cuda" if torch.cuda.is_available() else "cpu"
                 logger.info(f"Using device: {device}")
                 
+                # bfloat16 on GPUs that support it (Ampere+), float16 on older GPUs
+                if device == "cuda":
+                    torch_dtype = torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float16
+                else:
+                    torch_dtype = torch.float32
+                
+                model_kwargs = {
+                    "cache_dir": settings.huggingface_cache_dir,
+                    "torch_dtype": torch_dtype,
+                    "device_map": "auto" if device == "cuda" else None,
+                    "low_cpu_mem_usage": True,
+                }
+                
+                if settings.huggingface_attn_implementation:
+                    model_kwargs["attn_implementation"] = settings.huggingface_attn_implementation
+                
+                if settings.huggingface_quantization and device == "cuda":
+                    from transformers import BitsAndBytesConfig
+                    
+                    if settings.huggingface_quantization == "4bit":
+                        model_kwargs["quantization_config"] = BitsAndBytesConfig(
+                            load_in_4bit=True,
+                            bnb_4bit_compute_dtype=torch_dtype,
+                            bnb_4bit_quant_type="nf4"
+                        )
+                    elif settings.huggingface_quantization == "8bit":
+                        model_kwargs["quantization_config"] = BitsAndBytesConfig(load_in_8bit=True)
+                    else:
+                        logger.warning(f"Unknown quantization '{settings.huggingface_quantization}', loading unquantized")
+                
                 # Load model and tokenizer
                 tokenizer = AutoTokenizer.from_pretrained(
                     settings.huggingface_llm_model,
@@ -40,21 +96,26 @@ def get_llm() -> Union[ChatOpenAI, any]:
                 )
                 model = AutoModelForCausalLM.from_pretrained(
                     settings.huggingface_llm_model,
-                    cache_dir=settings.huggingface_cache_dir,
-                    torch_dtype=torch.float16 if device == "cuda" else torch.float32,
-                    device_map="auto" if device == "cuda" else None,
-                    low_cpu_mem_usage=True
+                    **model_kwargs
                 )
                 
+                # Greedy decoding at temperature 0, sampling otherwise
+                if settings.temperature > 0:
+                    generation_kwargs = {
+                        "do_sample": True,
+                        "temperature": settings.temperature,
+                        "top_p": 0.95,
+                    }
+                else:
+                    generation_kwargs = {"do_sample": False}
+                
                 # Create pipeline
                 pipe = pipeline(
                     "text-generation",
                     model=model,
                     tokenizer=tokenizer,
                     max_new_tokens=512,
-                    temperature=settings.temperature,
-                    do_sample=True if settings.temperature > 0 else False,
-                    top_p=0.95,
+                    **generation_kwargs
                 )
                 
                 llm = HuggingFacePipeline(pipeline=pipe)
@@ -105,19 +166,8 @@ def get_chat_llm_with_system_prompt(system_prompt: str = None) -> ChatOpenAI:
     return llm
 
 
-# Default system prompt for RAG with fallback to general knowledge
-def get_system_prompt(allow_general_knowledge: bool = True) -> str:
-    """
-    Get the system prompt based on configuration
-    
-    Args:
-        allow_general_knowledge: Whether to allow AI to use general knowledge
-        
-    Returns:
-        Appropriate system prompt
-    """
-    if allow_general_knowledge:
-        return """You are a helpful AI assistant that provides accurate and informative answers in English.
+# System prompt for RAG with fallback to general knowledge
+_GENERAL_KNOWLEDGE_SYSTEM_PROMPT = """You are a helpful AI assistant that provides accurate and informative answers in English.
 
 ANSWER PRIORITY:
 1. PRIMARY: If the provided context/documents contain relevant information, use that information to answer the question and cite the source
@@ -134,8 +184,9 @@ IMPORTANT RULES:
 - If you truly don't know something, say so
 
 Context from documents will be provided below (may be empty if no relevant documents found)."""
-    else:
-        return """You are a helpful AI assistant that answers questions based ONLY on the provided context.
+
+# System prompt restricting answers to the retrieved documents
+_DOCUMENTS_ONLY_SYSTEM_PROMPT = """You are a helpful AI assistant that answers questions based ONLY on the provided context.
 
 IMPORTANT RULES:
 1. ALWAYS respond in English language only, regardless of the language in the context or question
@@ -148,6 +199,25 @@ IMPORTANT RULES:
 
 Context will be provided to you along with the user's question."""
 
+# Both prompts are built once at import; get_system_prompt is a lookup
+_SYSTEM_PROMPTS = {
+    True: _GENERAL_KNOWLEDGE_SYSTEM_PROMPT,
+    False: _DOCUMENTS_ONLY_SYSTEM_PROMPT,
+}
+
+
+def get_system_prompt(allow_general_knowledge: bool = True) -> str:
+    """
+    Get the system prompt based on configuration
+    
+    Args:
+        allow_general_knowledge: Whether to allow AI to use general knowledge
+        
+    Returns:
+        Appropriate system prompt
+    """
+    return _SYSTEM_PROMPTS[bool(allow_general_knowledge)]
+
 
 # Keep backward compatibility
 DEFAULT_SYSTEM_PROMPT = get_system_prompt(True)
@@ -2,17 +2,58 @@
 Vector Store Management
 Handles FAISS vector store initialization, loading, and persistence
 """
+import asyncio
+import hashlib
+import json
 import os
+import pickle
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Set
+import faiss
+import numpy as np
+from langchain_community.docstore.in_memory import InMemoryDocstore
 from langchain_community.vectorstores import FAISS
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
 from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
 from app.core.embeddings import get_embeddings
 from app.core.config import get_settings
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Metadata key holding a precomputed embedding; such documents skip the embedding model
+EMBEDDING_METADATA_KEY = "embedding"
+
+
+class VectorStoreRetriever(BaseRetriever):
+    """Retriever that searches through VectorStoreManager's direct FAISS search path"""
+    
+    manager: Any
+    # Vector store the retriever was created for (lets chains detect a replaced store)
+    vectorstore: Any
+    k: int
+    
+    def _get_relevant_documents(
+        self,
+        query: str,
+        *,
+        run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        if self.manager.vectorstore is None:
+            # The store was cleared after this retriever was created
+            return []
+        return self.manager._search_queries([query], self.k)[0]
+    
+    def batch(self, inputs: List[str], config=None, *, return_exceptions: bool = False, **kwargs) -> List[List[Document]]:
+        """Retrieve for several queries with one embedding call and one FAISS search"""
+        if not inputs or self.manager.vectorstore is None:
+            return [[] for _ in inputs]
+        return self.manager._search_queries(list(inputs), self.k)
+
 
 class VectorStoreManager:
     """Manages FAISS vector store operations"""
@@ -23,6 +64,27 @@ class VectorStoreManager:
         self.vectorstore: Optional[FAISS] = None
         self.index_path = Path(self.settings.faiss_index_path)
         
+        # Serializes writes to the in-memory index
+        self._write_lock = threading.Lock()
+        
+        # True while the index (or its on-disk inverted lists) is memory-mapped read-only
+        self._index_mmapped = False
+        
+        # Writes mark the store dirty; it is flushed to disk at most every
+        # `faiss_flush_interval` seconds (immediately when the interval is 0)
+        self._dirty = False
+        
+        # Incremented on every write so dependent caches can detect stale data
+        self.revision = 0
+        
+        # Content hash of each ingested source (e.g. URL), used to skip unchanged re-ingests
+        self.sources_file = self.index_path / "sources.json"
+        self.source_hashes: Dict[str, str] = {}
+        
+        # Inverted index of docstore ids by metadata "source", so deleting a
+        # source touches only its own chunks instead of scanning the docstore
+        self.source_ids: Dict[str, Set[str]] = {}
+        
         # Ensure index directory exists
         self.index_path.mkdir(parents=True, exist_ok=True)
         
@@ -36,12 +98,21 @@ class VectorStoreManager:
             
             if index_file.exists():
                 logger.info(f"Loading existing FAISS index from {self.index_path}")
-                self.vectorstore = FAISS.load_local(
-                    str(self.index_path),
-                    self.embeddings,
-                    allow_dangerous_deserialization=True  # Required for loading pickled data
-                )
+                # On-disk inverted lists are always served read-only from their mapping
+                if self.settings.faiss_mmap or self._find_ivfdata_files():
+                    self.vectorstore = self._load_mmapped_vectorstore()
+                else:
+                    self.vectorstore = FAISS.load_local(
+                        str(self.index_path),
+                        self.embeddings,
+                        allow_dangerous_deserialization=True  # Required for loading pickled data
+                    )
                 logger.info("FAISS index loaded successfully")
+                if self._index_mmapped:
+                    self._remove_stale_ivfdata(self._ondisk_invlists_file())
+                self._apply_search_params()
+                self._load_source_hashes()
+                self._rebuild_source_index()
             else:
                 logger.info("No existing FAISS index found. Will create new one on first document ingestion.")
                 self.vectorstore = None
@@ -51,35 +122,522 @@ class VectorStoreManager:
             logger.info("Will create new index on first document ingestion")
             self.vectorstore = None
     
+    def _load_mmapped_vectorstore(self) -> FAISS:
+        """
+        Load the vector store with the FAISS index memory-mapped read-only
+        
+        Index pages are read from disk on demand and shared through the page
+        cache between worker processes. The docstore is still unpickled into memory.
+        
+        Returns:
+            FAISS vector store backed by the memory-mapped index
+        """
+        index_file = str(self.index_path / "index.faiss")
+        
+        if self._find_ivfdata_files():
+            # Lists in the .ivfdata file are mapped by FAISS itself; IO_FLAG_MMAP
+            # is not supported together with on-disk inverted lists
+            index = faiss.read_index(index_file, faiss.IO_FLAG_READ_ONLY | faiss.IO_FLAG_ONDISK_SAME_DIR)
+        else:
+            # IO_FLAG_MMAP maps IVF inverted lists but still copies the vectors of
+            # flat indexes into RAM; IO_FLAG_MMAP_IFC serves them from the mapping
+            index = faiss.read_index(index_file, faiss.IO_FLAG_MMAP_IFC | faiss.IO_FLAG_READ_ONLY)
+            if self._extract_ivf(index) is not None:
+                index = faiss.read_index(index_file, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+        
+        # Same layout FAISS.save_local writes
+        with open(self.index_path / "index.pkl", "rb") as f:
+            docstore, index_to_docstore_id = pickle.load(f)
+        
+        self._index_mmapped = True
+        logger.info("FAISS index memory-mapped read-only")
+        
+        return FAISS(
+            embedding_function=self.embeddings,
+            index=index,
+            docstore=docstore,
+            index_to_docstore_id=index_to_docstore_id
+        )
+    
+    def _ensure_writable_index(self):
+        """
+        Replace a memory-mapped read-only index with an in-RAM copy before writing (caller holds the write lock)
+        
+        On-disk inverted lists are copied into RAM as well, so after the first
+        write the process holds the whole index in memory again.
+        """
+        if not self._index_mmapped:
+            return
+        
+        logger.info("Loading FAISS index into memory for writing")
+        index = faiss.read_index(
+            str(self.index_path / "index.faiss"),
+            faiss.IO_FLAG_READ_ONLY | faiss.IO_FLAG_ONDISK_SAME_DIR
+        )
+        
+        # Writes never touch a live .ivfdata file; it is replaced on the next save
+        ivf = self._extract_ivf(index)
+        if ivf is not None and isinstance(faiss.downcast_InvertedLists(ivf.invlists), faiss.OnDiskInvertedLists):
+            invlists = faiss.ArrayInvertedLists(ivf.nlist, ivf.code_size)
+            self._copy_invlists(ivf.invlists, invlists)
+            ivf.replace_invlists(invlists, True)
+            invlists.this.disown()
+        
+        self.vectorstore.index = index
+        self._index_mmapped = False
+        self._apply_search_params()
+    
+    @staticmethod
+    def _extract_ivf(index: faiss.Index) -> Optional[faiss.IndexIVF]:
+        """Return the IVF layer of an index, or None for flat and other non-IVF indexes"""
+        try:
+            return faiss.extract_index_ivf(index)
+        except RuntimeError:
+            return None
+    
+    @staticmethod
+    def _copy_invlists(source, target):
+        """Copy every inverted list's ids and codes from one InvertedLists to another"""
+        for list_no in range(source.nlist):
+            size = source.list_size(list_no)
+            if size:
+                target.add_entries(list_no, size, source.get_ids(list_no), source.get_codes(list_no))
+    
+    def _find_ivfdata_files(self) -> List[Path]:
+        """List the on-disk inverted list files in the index directory"""
+        return list(self.index_path.glob("index.*.ivfdata"))
+    
+    def _remove_stale_ivfdata(self, keep: Optional[Path]):
+        """
+        Delete every .ivfdata file except the one the current index uses
+        
+        Leftovers come from earlier saves or from a save that failed before
+        its header was swapped in. Processes that still map an older file keep
+        their mapping after the unlink.
+        
+        Args:
+            keep: List file referenced by the current index, or None to keep none
+        """
+        for stale_file in self._find_ivfdata_files():
+            if keep is None or stale_file.name != keep.name:
+                stale_file.unlink(missing_ok=True)
+                logger.info(f"Removed unused inverted list file {stale_file.name}")
+    
+    def _ondisk_invlists_file(self) -> Optional[Path]:
+        """Return the .ivfdata file the loaded index reads its lists from, if any"""
+        ivf = self._extract_ivf(self.vectorstore.index)
+        if ivf is None:
+            return None
+        
+        invlists = faiss.downcast_InvertedLists(ivf.invlists)
+        if not isinstance(invlists, faiss.OnDiskInvertedLists):
+            return None
+        return Path(invlists.filename)
+    
+    def _apply_search_params(self):
+        """Set the number of probed inverted lists when the index is IVF-based"""
+        try:
+            faiss.extract_index_ivf(self.vectorstore.index).nprobe = self.settings.faiss_nprobe
+        except RuntimeError:
+            # Flat and other non-IVF indexes have no nprobe
+            pass
+    
+    def _train_index(self, index: faiss.Index, vectors: np.ndarray):
+        """
+        Train a FAISS index, running IVF k-means on GPU when one is available
+        
+        Only the clustering runs on GPU; the trained index stays on CPU for serving.
+        
+        Args:
+            index: Untrained index built by index_factory
+            vectors: (n, d) float32 training vectors
+        """
+        if faiss.get_num_gpus() > 0:
+            try:
+                ivf = faiss.extract_index_ivf(index)
+                ivf.clustering_index = faiss.index_cpu_to_all_gpus(faiss.IndexFlatL2(ivf.d))
+                logger.info(f"Training IVF centroids on {faiss.get_num_gpus()} GPU(s)")
+            except RuntimeError:
+                # Not an IVF index; nothing to offload
+                pass
+        
+        index.train(vectors)
+    
+    def _create_vectorstore(self, embeddings: np.ndarray) -> FAISS:
+        """
+        Create an empty vector store for the first ingest's embeddings
+        
+        Uses an exact flat index unless `faiss_index_factory` is set, in which
+        case the factory index (e.g. IVF-PQ) is trained on these vectors. The
+        index type is fixed from then on: if training fails (e.g. fewer vectors
+        than IVF lists) the store stays flat until it is cleared and rebuilt.
+        
+        Args:
+            embeddings: (n, d) float32 matrix of every vector in the first ingest
+            
+        Returns:
+            Empty FAISS vector store ready for vectors to be added
+        """
+        dimension = embeddings.shape[1]
+        index = None
+        
+        if self.settings.faiss_index_factory:
+            try:
+                index = faiss.index_factory(dimension, self.settings.faiss_index_factory, faiss.METRIC_L2)
+                self._train_index(index, embeddings)
+                logger.info(f"Trained FAISS '{self.settings.faiss_index_factory}' index on {len(embeddings)} vectors")
+            except RuntimeError as e:
+                # e.g. fewer training vectors than IVF clusters
+                logger.warning(f"Could not build '{self.settings.faiss_index_factory}' index, using flat index: {e}")
+                index = None
+        
+        if index is None:
+            index = faiss.IndexFlatL2(dimension)
+        
+        vectorstore = FAISS(
+            embedding_function=self.embeddings,
+            index=index,
+            docstore=InMemoryDocstore(),
+            index_to_docstore_id={}
+        )
+        self.vectorstore = vectorstore
+        self._apply_search_params()
+        return vectorstore
+    
+    def _load_source_hashes(self):
+        """Load content hashes of previously ingested sources"""
+        if not self.sources_file.exists():
+            return
+        
+        try:
+            with open(self.sources_file, 'r') as f:
+                self.source_hashes = json.load(f)
+            logger.info(f"Loaded content hashes for {len(self.source_hashes)} ingested source(s)")
+        except Exception as e:
+            logger.error(f"Error loading sources file: {e}")
+            self.source_hashes = {}
+    
+    def _rebuild_source_index(self):
+        """Build the source -> docstore ids index from the loaded docstore"""
+        self.source_ids = {}
+        
+        for doc_id in self.vectorstore.index_to_docstore_id.values():
+            doc = self.vectorstore.docstore.search(doc_id)
+            if isinstance(doc, Document):
+                self._index_source(doc.metadata.get("source"), doc_id)
+    
+    def _index_source(self, source: Optional[str], doc_id: str):
+        """Record that a docstore id belongs to a source"""
+        if source is not None:
+            self.source_ids.setdefault(source, set()).add(doc_id)
+    
+    def get_source_hash(self, source: str) -> Optional[str]:
+        """
+        Get the content hash recorded when a source was last ingested
+        
+        Args:
+            source: Source identifier (e.g. URL)
+            
+        Returns:
+            Content hash, or None if the source has not been ingested
+        """
+        return self.source_hashes.get(source)
+    
+    def set_source_hash(self, source: str, content_hash: str):
+        """
+        Record the content hash of an ingested source (persisted on the next flush)
+        
+        Args:
+            source: Source identifier (e.g. URL)
+            content_hash: Hash of the ingested content
+        """
+        with self._write_lock:
+            self.source_hashes[source] = content_hash
+            self._mark_dirty()
+    
+    def _save_source_hashes(self):
+        """Write the source content hashes to disk"""
+        try:
+            with open(self.sources_file, 'w') as f:
+                json.dump(self.source_hashes, f, indent=2)
+        except Exception as e:
+            logger.error(f"Error saving sources file: {e}")
+    
+    def _mark_dirty(self):
+        """Record an in-memory write, saving right away when write-behind is disabled (caller holds the write lock)"""
+        self._dirty = True
+        
+        if self.settings.faiss_flush_interval <= 0:
+            self._flush_locked()
+    
+    def _flush_locked(self):
+        """Save the index and source hashes if there are unsaved writes (caller holds the write lock)"""
+        if not self._dirty:
+            return
+        
+        # Never rewrite index.faiss while it is mapped into memory
+        self._ensure_writable_index()
+        self.save()
+        self._save_source_hashes()
+        self._dirty = False
+    
+    def flush(self):
+        """Persist any writes not yet saved to disk"""
+        with self._write_lock:
+            self._flush_locked()
+    
+    async def flush_periodically(self):
+        """Flush pending writes every `faiss_flush_interval` seconds until cancelled"""
+        interval = self.settings.faiss_flush_interval
+        
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(self.flush)
+            except Exception as e:
+                logger.error(f"Error flushing vector store: {e}")
+    
+    def _dedupe_documents(self, documents: List[Document]) -> List[Document]:
+        """
+        Drop chunks whose text repeats an earlier chunk of the same source in the batch
+        
+        Duplicates are matched by a 64-bit blake2b hash of the source and page
+        content, so a file's repeated boilerplate (headers, footers) is embedded
+        once, while identical text in two files is kept for each of them (and
+        deleting one source never removes text the other still needs).
+        
+        Args:
+            documents: List of LangChain Document objects
+            
+        Returns:
+            Documents with duplicates removed, in input order
+        """
+        seen: Set[bytes] = set()
+        unique: List[Document] = []
+        
+        for doc in documents:
+            digest = hashlib.blake2b(digest_size=8)
+            digest.update(str(doc.metadata.get("source", "")).encode("utf-8"))
+            digest.update(b"\0")
+            digest.update(doc.page_content.encode("utf-8"))
+            digest = digest.digest()
+            if digest not in seen:
+                seen.add(digest)
+                unique.append(doc)
+        
+        if len(unique) < len(documents):
+            logger.info(f"Skipped {len(documents) - len(unique)} duplicate chunks")
+        
+        return unique
+    
+    def _is_local_embedding_model(self) -> bool:
+        """Whether embeddings are computed in-process by a local HuggingFace model"""
+        return bool(
+            self.settings.use_huggingface_embeddings
+            and not self.settings.huggingface_embeddings_endpoint
+        )
+    
+    def _order_for_embedding(self, documents: List[Document]) -> List[Document]:
+        """
+        Sort documents by text length for local HuggingFace embedding models
+        
+        Each encode batch is padded to its longest text, so grouping texts of
+        similar length wastes fewer tokens. Index order does not matter because
+        every chunk keeps its own docstore id and metadata.
+        
+        Args:
+            documents: List of LangChain Document objects
+            
+        Returns:
+            Documents ordered for embedding
+        """
+        if not self._is_local_embedding_model():
+            return documents
+        
+        return sorted(documents, key=lambda doc: len(doc.page_content))
+    
+    def _embed_documents(self, documents: List[Document], parallel: bool = True) -> np.ndarray:
+        """
+        Get one embedding per document, calling the model only where needed
+        
+        Documents carrying a precomputed vector in `metadata["embedding"]` use it
+        as is; the rest are embedded by the model.
+        
+        Args:
+            documents: List of LangChain Document objects
+            parallel: Allow concurrent model calls (see _embed_texts)
+            
+        Returns:
+            (n, d) float32 matrix with one row per document, in input order
+        """
+        pre_embedded = [i for i, doc in enumerate(documents) if EMBEDDING_METADATA_KEY in doc.metadata]
+        
+        if not pre_embedded:
+            return self._embed_texts([doc.page_content for doc in documents], parallel)
+        
+        pre_embedded_vectors = np.asarray(
+            [documents[i].metadata[EMBEDDING_METADATA_KEY] for i in pre_embedded],
+            dtype=np.float32
+        )
+        if len(pre_embedded) == len(documents):
+            return np.ascontiguousarray(pre_embedded_vectors)
+        
+        to_embed = [i for i, doc in enumerate(documents) if EMBEDDING_METADATA_KEY not in doc.metadata]
+        model_vectors = self._embed_texts([documents[i].page_content for i in to_embed], parallel)
+        
+        if pre_embedded_vectors.shape[1] != model_vectors.shape[1]:
+            raise ValueError(
+                f"Precomputed embeddings have dimension {pre_embedded_vectors.shape[1]}, "
+                f"but the embedding model produces {model_vectors.shape[1]}"
+            )
+        
+        embeddings = np.empty((len(documents), model_vectors.shape[1]), dtype=np.float32)
+        embeddings[pre_embedded] = pre_embedded_vectors
+        embeddings[to_embed] = model_vectors
+        
+        logger.info(f"Used precomputed embeddings for {len(pre_embedded)} of {len(documents)} documents")
+        return embeddings
+    
+    def _embed_texts(self, texts: List[str], parallel: bool = True) -> np.ndarray:
+        """
+        Embed texts with the embedding model, `embed_batch_size` texts per model call
+        
+        For remote embedding APIs, up to `ingest_concurrency` calls are in flight
+        at once on worker threads; local models embed one batch at a time.
+        
+        Args:
+            texts: Texts to embed
+            parallel: Allow concurrent model calls; False when the caller already
+                runs up to `ingest_concurrency` of these at once
+            
+        Returns:
+            (n, d) float32 matrix with one row per text, in input order
+        """
+        batch_size = max(1, self.settings.embed_batch_size)
+        text_batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+        
+        max_workers = min(max(1, self.settings.ingest_concurrency), len(text_batches))
+        
+        if not parallel or self._is_local_embedding_model() or max_workers <= 1:
+            return self._collect_embeddings(
+                self.embeddings.embed_documents(batch) for batch in text_batches
+            )
+        
+        # Remote calls are I/O-bound; map keeps results in batch order
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return self._collect_embeddings(
+                executor.map(self.embeddings.embed_documents, text_batches)
+            )
+    
+    @staticmethod
+    def _collect_embeddings(batch_embeddings: Iterable[List[List[float]]]) -> np.ndarray:
+        """
+        Copy per-batch embedding lists into one C-contiguous float32 matrix
+        
+        Each batch's Python float lists are released as soon as they are copied,
+        instead of holding every vector as Python floats until the end.
+        
+        Args:
+            batch_embeddings: Embedding lists, one per batch, in order
+            
+        Returns:
+            (n, d) float32 matrix
+        """
+        blocks = [np.asarray(vectors, dtype=np.float32) for vectors in batch_embeddings]
+        
+        if len(blocks) == 1:
+            return np.ascontiguousarray(blocks[0])
+        
+        return np.concatenate(blocks)
+    
+    def _add_embedded_documents(self, documents: List[Document], embeddings: np.ndarray):
+        """
+        Add already-embedded documents to the vector store (caller holds the write lock)
+        
+        The float32 matrix goes straight to `index.add`, skipping the extra
+        list-to-array copy `add_embeddings` would make.
+        
+        Args:
+            documents: List of LangChain Document objects
+            embeddings: (n, d) float32 matrix, one row per document
+        """
+        ids = [str(uuid.uuid4()) for _ in documents]
+        
+        if self.vectorstore is not None and embeddings.shape[1] != self.vectorstore.index.d:
+            raise ValueError(
+                f"Embedding dimension {embeddings.shape[1]} does not match the index dimension {self.vectorstore.index.d}"
+            )
+        
+        if self.vectorstore is None:
+            # Create new vector store
+            logger.info(f"Creating new FAISS index with {len(documents)} documents")
+            self._create_vectorstore(embeddings)
+        else:
+            # Add to existing vector store
+            logger.info(f"Adding {len(documents)} documents to existing FAISS index")
+            self._ensure_writable_index()
+        
+        vectorstore = self.vectorstore
+        if vectorstore._normalize_L2:
+            faiss.normalize_L2(embeddings)
+        
+        if self._extract_ivf(vectorstore.index) is None:
+            # Flat indexes number vectors by position (and compact on delete)
+            start = vectorstore.index.ntotal
+            vectorstore.index.add(embeddings)
+        else:
+            # IVF indexes keep the ids they are given and do not renumber on
+            # delete, so new vectors get ids above every id still in use
+            start = max(vectorstore.index_to_docstore_id, default=-1) + 1
+            vectorstore.index.add_with_ids(
+                embeddings,
+                np.arange(start, start + len(embeddings), dtype=np.int64)
+            )
+        vectorstore.docstore.add({
+            doc_id: Document(
+                id=doc_id,
+                page_content=doc.page_content,
+                # The vector already lives in the index; don't keep a second copy in the docstore
+                metadata={key: value for key, value in doc.metadata.items() if key != EMBEDDING_METADATA_KEY}
+            )
+            for doc_id, doc in zip(ids, documents)
+        })
+        vectorstore.index_to_docstore_id.update(
+            {start + offset: doc_id for offset, doc_id in enumerate(ids)}
+        )
+        
+        for doc, doc_id in zip(documents, ids):
+            self._index_source(doc.metadata.get("source"), doc_id)
+        
+        self.revision += 1
+    
     def add_documents(self, documents: List[Document]) -> int:
         """
         Add documents to the vector store
         
+        Duplicate chunks are dropped first; texts are embedded in batches of
+        `embed_batch_size` rather than one model call per chunk or one call
+        for the whole list. Documents with a precomputed vector in
+        `metadata["embedding"]` skip the embedding model.
+        
         Args:
             documents: List of LangChain Document objects
             
         Returns:
-            Number of documents added
+            Number of documents added (after removing duplicates)
         """
         if not documents:
             logger.warning("No documents to add")
             return 0
         
+        documents = self._order_for_embedding(self._dedupe_documents(documents))
+        
         try:
-            if self.vectorstore is None:
-                # Create new vector store
-                logger.info(f"Creating new FAISS index with {len(documents)} documents")
-                self.vectorstore = FAISS.from_documents(
-                    documents=documents,
-                    embedding=self.embeddings
-                )
-            else:
-                # Add to existing vector store
-                logger.info(f"Adding {len(documents)} documents to existing FAISS index")
-                self.vectorstore.add_documents(documents)
+            embeddings = self._embed_documents(documents)
             
-            # Save to disk
-            self.save()
+            with self._write_lock:
+                self._add_embedded_documents(documents, embeddings)
+                self._mark_dirty()
             
             logger.info(f"Successfully added {len(documents)} documents to vector store")
             return len(documents)
@@ -88,20 +646,240 @@ class VectorStoreManager:
             logger.error(f"Error adding documents to vector store: {e}")
             raise
     
+    async def aadd_documents(self, documents: List[Document]) -> int:
+        """
+        Add documents to the vector store in batches without blocking the event loop
+        
+        Duplicate chunks are dropped, then documents are split into batches of
+        `ingest_batch_size`; for remote embedding APIs up to `ingest_concurrency`
+        batches are embedded at the same time on worker threads (a local model
+        embeds one batch at a time, since concurrent encodes only contend for
+        the same cores), then all batches are written to the index in one step.
+        Each batch makes its model calls one after another, so no more than
+        `ingest_concurrency` calls are ever in flight.
+        
+        Args:
+            documents: List of LangChain Document objects
+            
+        Returns:
+            Number of documents added (after removing duplicates)
+        """
+        if not documents:
+            logger.warning("No documents to add")
+            return 0
+        
+        documents = self._order_for_embedding(self._dedupe_documents(documents))
+        
+        batch_size = max(1, self.settings.ingest_batch_size)
+        batches = [
+            documents[i:i + batch_size]
+            for i in range(0, len(documents), batch_size)
+        ]
+        concurrency = 1 if self._is_local_embedding_model() else max(1, self.settings.ingest_concurrency)
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def _embed_batch(batch: List[Document]) -> np.ndarray:
+            async with semaphore:
+                return await asyncio.to_thread(self._embed_documents, batch, False)
+        
+        def _store_batches(embedded_batches: List[np.ndarray]):
+            with self._write_lock:
+                if self.vectorstore is None:
+                    # Train a new index on every vector of this ingest, not just
+                    # the first batch, which is too small for typical IVF sizes
+                    self._create_vectorstore(np.concatenate(embedded_batches))
+                
+                for batch, embeddings in zip(batches, embedded_batches):
+                    self._add_embedded_documents(batch, embeddings)
+                self._mark_dirty()
+        
+        try:
+            logger.info(f"Embedding {len(documents)} documents in {len(batches)} batch(es)")
+            embedded_batches = await asyncio.gather(*(_embed_batch(batch) for batch in batches))
+            await asyncio.to_thread(_store_batches, embedded_batches)
+            
+            logger.info(f"Successfully added {len(documents)} documents to vector store")
+            return len(documents)
+            
+        except Exception as e:
+            logger.error(f"Error adding documents to vector store: {e}")
+            raise
+    
+    def get_source_ids(self, source: str) -> Set[str]:
+        """
+        Get the docstore ids of all chunks ingested from a source
+        
+        Args:
+            source: Source identifier (e.g. URL or filename)
+            
+        Returns:
+            Set of docstore ids (empty if the source is unknown)
+        """
+        return set(self.source_ids.get(source, ()))
+    
+    def delete_documents(self, ids: Iterable[str]) -> int:
+        """
+        Delete chunks from the vector store by docstore id
+        
+        Args:
+            ids: Docstore ids to delete
+            
+        Returns:
+            Number of chunks deleted
+        """
+        ids = list(ids)
+        if not ids or self.vectorstore is None:
+            return 0
+        
+        try:
+            with self._write_lock:
+                self._ensure_writable_index()
+                
+                # Unindex before deleting while the documents are still in the docstore
+                for doc_id in ids:
+                    doc = self.vectorstore.docstore.search(doc_id)
+                    if isinstance(doc, Document):
+                        source = doc.metadata.get("source")
+                        source_ids = self.source_ids.get(source)
+                        if source_ids is not None:
+                            source_ids.discard(doc_id)
+                            if not source_ids:
+                                del self.source_ids[source]
+                
+                if self._extract_ivf(self.vectorstore.index) is None:
+                    self.vectorstore.delete(ids)
+                else:
+                    self._delete_ivf_vectors(ids)
+                self.revision += 1
+                self._mark_dirty()
+            
+            logger.info(f"Deleted {len(ids)} chunks from vector store")
+            return len(ids)
+            
+        except Exception as e:
+            logger.error(f"Error deleting documents from vector store: {e}")
+            raise
+    
+    def _delete_ivf_vectors(self, ids: List[str]):
+        """
+        Remove chunks from an IVF index by their stored FAISS ids (caller holds the write lock)
+        
+        LangChain's FAISS.delete renumbers index_to_docstore_id to 0..n-1, which
+        only matches flat indexes; IVF indexes keep the remaining ids as they are.
+        
+        Args:
+            ids: Docstore ids to delete
+        """
+        vectorstore = self.vectorstore
+        doc_ids = set(ids)
+        labels = [
+            label for label, doc_id in vectorstore.index_to_docstore_id.items()
+            if doc_id in doc_ids
+        ]
+        
+        vectorstore.index.remove_ids(np.asarray(labels, dtype=np.int64))
+        vectorstore.docstore.delete([vectorstore.index_to_docstore_id[label] for label in labels])
+        for label in labels:
+            del vectorstore.index_to_docstore_id[label]
+    
+    def delete_by_source(self, source: str) -> int:
+        """
+        Delete every chunk ingested from a source using the source index
+        
+        The source's content hash is forgotten too, so ingesting it again
+        adds it back instead of being skipped as unchanged.
+        
+        Args:
+            source: Source identifier (e.g. URL or filename)
+            
+        Returns:
+            Number of chunks deleted
+        """
+        deleted = self.delete_documents(self.get_source_ids(source))
+        
+        with self._write_lock:
+            if self.source_hashes.pop(source, None) is not None:
+                self._mark_dirty()
+        
+        return deleted
+    
     def save(self):
-        """Persist vector store to disk"""
+        """Persist vector store to disk (index.faiss + index.pkl)"""
         if self.vectorstore is None:
             logger.warning("No vector store to save")
             return
         
         try:
             logger.info(f"Saving FAISS index to {self.index_path}")
-            self.vectorstore.save_local(str(self.index_path))
+            
+            # Same files as FAISS.save_local (so load_local still works), but the
+            # docstore is pickled with the newest protocol and both files are
+            # written to temporary names and swapped in atomically
+            index_file = self.index_path / "index.faiss"
+            pkl_file = self.index_path / "index.pkl"
+            tmp_index_file = self.index_path / "index.faiss.tmp"
+            tmp_pkl_file = self.index_path / "index.pkl.tmp"
+            
+            faiss.write_index(self.vectorstore.index, str(tmp_index_file))
+            
+            ivfdata_file = None
+            try:
+                if self.settings.faiss_ondisk_invlists and self._extract_ivf(self.vectorstore.index) is not None:
+                    ivfdata_file = self._write_ondisk_invlists(tmp_index_file)
+                
+                with open(tmp_pkl_file, "wb") as f:
+                    pickle.dump(
+                        (self.vectorstore.docstore, self.vectorstore.index_to_docstore_id),
+                        f,
+                        protocol=pickle.HIGHEST_PROTOCOL
+                    )
+            except Exception:
+                # Nothing references the new files until the headers are swapped in
+                for partial_file in (tmp_index_file, tmp_pkl_file, ivfdata_file):
+                    if partial_file is not None:
+                        partial_file.unlink(missing_ok=True)
+                raise
+            
+            os.replace(tmp_index_file, index_file)
+            os.replace(tmp_pkl_file, pkl_file)
+            
+            self._remove_stale_ivfdata(ivfdata_file)
+            
             logger.info("FAISS index saved successfully")
         except Exception as e:
             logger.error(f"Error saving FAISS index: {e}")
             raise
     
+    def _write_ondisk_invlists(self, index_file: Path) -> Path:
+        """
+        Move the inverted lists of a written IVF index into a new .ivfdata file
+        
+        The index file is re-read memory-mapped, its lists are copied into
+        OnDiskInvertedLists and it is rewritten as a small header pointing at
+        them. Every save writes all lists to a fresh .ivfdata name (nothing is
+        appended in place), so the header swap stays atomic and processes
+        still mapping the previous file are never disturbed.
+        
+        Args:
+            index_file: Index file just written with in-memory lists (rewritten in place)
+            
+        Returns:
+            Path of the new .ivfdata file
+        """
+        ivfdata_file = self.index_path / f"index.{uuid.uuid4().hex[:12]}.ivfdata"
+        
+        index = faiss.read_index(str(index_file), faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+        ivf = faiss.extract_index_ivf(index)
+        
+        invlists = faiss.OnDiskInvertedLists(ivf.nlist, ivf.code_size, str(ivfdata_file))
+        self._copy_invlists(ivf.invlists, invlists)
+        ivf.replace_invlists(invlists, True)
+        invlists.this.disown()
+        
+        faiss.write_index(index, str(index_file))
+        logger.info(f"Inverted lists written to {ivfdata_file.name}")
+        return ivfdata_file
+    
     def get_retriever(self, k: int = None):
         """
         Get a retriever from the vector store
@@ -110,7 +888,8 @@ class VectorStoreManager:
             k: Number of documents to retrieve (default from settings)
             
         Returns:
-            VectorStoreRetriever instance
+            VectorStoreRetriever over the direct FAISS search path, or None
+            if no documents have been ingested
         """
         if self.vectorstore is None:
             logger.warning("Vector store not initialized. No documents have been ingested yet.")
@@ -119,9 +898,7 @@ class VectorStoreManager:
         if k is None:
             k = self.settings.retrieval_k
         
-        retriever = self.vectorstore.as_retriever(
-            search_kwargs={"k": k}
-        )
+        retriever = VectorStoreRetriever(manager=self, vectorstore=self.vectorstore, k=k)
         
         logger.info(f"Retriever created with k={k}")
         return retriever
@@ -145,28 +922,125 @@ class VectorStoreManager:
             k = self.settings.retrieval_k
         
         try:
-            results = self.vectorstore.similarity_search(query, k=k)
+            results = self._search_queries([query], k)[0]
             logger.info(f"Found {len(results)} similar documents for query")
             return results
         except Exception as e:
             logger.error(f"Error during similarity search: {e}")
             return []
     
+    def _search_queries(self, queries: List[str], k: int) -> List[List[Document]]:
+        """
+        Embed queries and search the index, raising on errors
+        
+        A single query goes through embed_query (and its cache); several are
+        embedded in one model call.
+        
+        Args:
+            queries: Search queries (the vector store must exist)
+            k: Number of results per query
+            
+        Returns:
+            One list of documents per query, in query order
+        """
+        if len(queries) == 1:
+            query_vectors = np.asarray([self.embeddings.embed_query(queries[0])], dtype=np.float32)
+        else:
+            query_vectors = np.asarray(self.embeddings.embed_documents(queries), dtype=np.float32)
+        
+        return self._search_vectors(query_vectors, k)
+    
+    def _search_vectors(self, query_vectors: np.ndarray, k: int) -> List[List[Document]]:
+        """
+        Search the raw FAISS index and resolve hits to documents
+        
+        Skips LangChain's per-hit wrapper work (score tuples, filters, copies)
+        and goes straight from FAISS row ids to docstore entries. Queries are
+        normalized like the stored vectors when the store uses cosine distance,
+        and hits without a mapping or docstore entry are skipped, as LangChain
+        would otherwise fail on them.
+        
+        Args:
+            query_vectors: (n, d) float32 query matrix (normalized in place if needed)
+            k: Number of results per query
+            
+        Returns:
+            One list of documents per query row
+        """
+        if self.vectorstore._normalize_L2:
+            faiss.normalize_L2(query_vectors)
+        
+        _, indices = self.vectorstore.index.search(query_vectors, k)
+        index_to_docstore_id = self.vectorstore.index_to_docstore_id
+        docs_by_id = self.vectorstore.docstore._dict
+        
+        results = []
+        for row in indices:
+            # FAISS pads with -1 when fewer than k vectors match
+            docs = (docs_by_id.get(index_to_docstore_id.get(i)) for i in row if i != -1)
+            results.append([doc for doc in docs if doc is not None])
+        
+        return results
+    
+    def similarity_search_batch(self, queries: List[str], k: int = None) -> List[List[Document]]:
+        """
+        Perform similarity search for several queries at once
+        
+        All queries are embedded in one model call and searched with a single
+        FAISS search over the query matrix.
+        
+        Args:
+            queries: Search queries
+            k: Number of results to return per query
+            
+        Returns:
+            One list of relevant documents per query, in query order
+        """
+        if not queries:
+            return []
+        
+        if self.vectorstore is None:
+            logger.warning("Vector store not initialized")
+            return [[] for _ in queries]
+        
+        if k is None:
+            k = self.settings.retrieval_k
+        
+        try:
+            results = self._search_queries(queries, k)
+            
+            logger.info(f"Found similar documents for {len(queries)} queries")
+            return results
+        except Exception as e:
+            logger.error(f"Error during batch similarity search: {e}")
+            return [[] for _ in queries]
+    
     def clear_index(self):
         """Clear the entire vector store index"""
         try:
             logger.warning("Clearing FAISS index")
             
-            # Delete index files
-            index_file = self.index_path / "index.faiss"
-            pkl_file = self.index_path / "index.pkl"
-            
-            if index_file.exists():
-                index_file.unlink()
-            if pkl_file.exists():
-                pkl_file.unlink()
+            with self._write_lock:
+                # Delete index files
+                index_file = self.index_path / "index.faiss"
+                pkl_file = self.index_path / "index.pkl"
+                
+                if index_file.exists():
+                    index_file.unlink()
+                if pkl_file.exists():
+                    pkl_file.unlink()
+                if self.sources_file.exists():
+                    self.sources_file.unlink()
+                for ivfdata_file in self._find_ivfdata_files():
+                    ivfdata_file.unlink()
+                
+                self.vectorstore = None
+                self._index_mmapped = False
+                self._dirty = False
+                self.source_hashes = {}
+                self.source_ids = {}
+                self.revision += 1
             
-            self.vectorstore = None
             logger.info("FAISS index cleared successfully")
             
         except Exception as e:
@@ -180,6 +1054,7 @@ class VectorStoreManager:
 
 # Global vector store instance
 _vectorstore_manager: Optional[VectorStoreManager] = None
+_vectorstore_manager_lock = threading.Lock()
 
 
 def get_vectorstore_manager() -> VectorStoreManager:
@@ -187,6 +1062,9 @@ def get_vectorstore_manager() -> VectorStoreManager:
     global _vectorstore_manager
     
     if _vectorstore_manager is None:
-        _vectorstore_manager = VectorStoreManager()
+        # Loading the index is slow; make sure concurrent first callers load it only once
+        with _vectorstore_manager_lock:
+            if _vectorstore_manager is None:
+                _vectorstore_manager = VectorStoreManager()
     
     return _vectorstore_manager
@@ -2,19 +2,121 @@
 FastAPI Main Application
 Production-grade RAG Chatbot Backend
 """
-from fastapi import FastAPI, Request
+import asyncio
+import sys
+import orjson
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import HTMLResponse, ORJSONResponse, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from contextlib import asynccontextmanager
 from typing import Optional
 from app.api import chat, ingest, health
 from app.core.config import get_settings
+from app.core.embeddings import get_embeddings
+from app.core.llm import get_llm
+from app.core.vectorstore import get_vectorstore_manager
 from app.services.document_monitor import get_document_monitor
+from app.services.document_loader import get_document_loader, shutdown_chunk_pool
+from app.services.ingest_jobs import get_ingest_job_manager
+from app.services.rag_chain import get_rag_chain
+from app.services.web_scraper import get_web_scraper
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Settings are immutable for the lifetime of the process; resolve them once
+settings = get_settings()
+
+# Let browsers reuse the chat page briefly instead of refetching it on every load
+INDEX_CACHE_HEADERS = {"Cache-Control": "public, max-age=60"}
+
+
+async def _init_in_thread(name: str, factory):
+    """Run a slow singleton factory on a worker thread, logging instead of raising on failure"""
+    try:
+        return await asyncio.to_thread(factory)
+    except Exception as e:
+        logger.error(f"Could not initialize {name} at startup (will retry on first use): {e}")
+        return None
+
+
+async def _bind_services(app: FastAPI):
+    """
+    Resolve service singletons concurrently and bind them to app.state,
+    so request handlers read them directly instead of calling the factories
+    """
+    # Models first, in parallel: they dominate startup time and the services
+    # below reuse them (each cached factory must only be entered once)
+    await asyncio.gather(
+        _init_in_thread("embeddings", get_embeddings),
+        _init_in_thread("llm", get_llm)
+    )
+    
+    services = {
+        "document_loader": get_document_loader,
+        "web_scraper": get_web_scraper,
+        "document_monitor": get_document_monitor,
+        "vectorstore_manager": get_vectorstore_manager,
+        "rag_chain": get_rag_chain,
+        "ingest_job_manager": get_ingest_job_manager,
+    }
+    
+    instances = await asyncio.gather(
+        *(_init_in_thread(name, factory) for name, factory in services.items())
+    )
+    
+    for name, instance in zip(services, instances):
+        if instance is not None:
+            setattr(app.state, name, instance)
+
+
+def _warmup_models():
+    """
+    Send a tiny input through the models so weights, CUDA kernels and HTTP
+    connections are ready before the first request arrives
+    """
+    try:
+        get_embeddings().embed_query("warmup")
+        logger.info("Embedding model warmed up")
+    except Exception as e:
+        logger.warning(f"Embedding warmup failed: {e}")
+    
+    # Remote LLMs are billed per call and have no local state to warm
+    if settings.use_huggingface_llm and not settings.huggingface_llm_endpoint:
+        try:
+            get_llm().invoke("ok")
+            logger.info("Hugging Face LLM warmed up")
+        except Exception as e:
+            logger.warning(f"LLM warmup failed: {e}")
+
+
+async def _process_startup_documents(monitor, done: asyncio.Event):
+    """Process new documents from the documents folder on a worker thread"""
+    try:
+        logger.info("Checking for new documents in folder...")
+        result = await asyncio.to_thread(monitor.process_new_documents)
+        
+        if result['documents_processed'] > 0:
+            logger.info(f"✅ Auto-processed {result['documents_processed']} document(s) on startup")
+        else:
+            logger.info("No new documents to process")
+        
+        return result
+    finally:
+        done.set()
+
+
+async def _finish_startup(app: FastAPI, ingest_done: asyncio.Event):
+    """Warm up the models and wait for the startup folder ingest, then mark the app ready"""
+    if settings.warmup_on_startup:
+        await asyncio.to_thread(_warmup_models)
+    
+    await ingest_done.wait()
+    app.state.ready = True
+    logger.info("Startup work finished, application is ready")
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -24,7 +126,7 @@ async def lifespan(app: FastAPI):
     """
     # Startup
     logger.info("Starting RAG Chatbot API...")
-    settings = get_settings()
+    app.state.ready = False
     logger.info(f"Application: {settings.app_name} v{settings.app_version}")
     
     # Log which models are being used
@@ -42,25 +144,46 @@ async def lifespan(app: FastAPI):
     logger.info(f"FAISS Index Path: {settings.faiss_index_path}")
     logger.info(f"Documents Folder: {settings.documents_folder}")
     
-    # Auto-process new documents from folder
+    # Initialize components now rather than on the first request
+    await _bind_services(app)
+    
+    # Auto-process new documents from folder in the background so the server
+    # accepts requests right away; progress is reported at /health/ingest-status
+    app.state.startup_ingest_job_id = None
+    ingest_done = asyncio.Event()
     try:
-        logger.info("Checking for new documents in folder...")
-        monitor = get_document_monitor()
-        result = monitor.process_new_documents()
-        if result['documents_processed'] > 0:
-            logger.info(f"✅ Auto-processed {result['documents_processed']} document(s) on startup")
-        else:
-            logger.info("No new documents to process")
+        app.state.startup_ingest_job_id = get_ingest_job_manager().submit(
+            _process_startup_documents(get_document_monitor(), ingest_done)
+        )
     except Exception as e:
         logger.error(f"Error during auto-processing: {e}")
+        ingest_done.set()
+    
+    # Model warmup runs in the background too; /health answers 503 until it
+    # and the folder ingest have finished
+    startup_task = asyncio.create_task(_finish_startup(app, ingest_done))
+    
+    # Save index changes in the background instead of after every write
+    vectorstore_manager = getattr(app.state, "vectorstore_manager", None)
+    flush_task = None
+    if vectorstore_manager is not None and settings.faiss_flush_interval > 0:
+        flush_task = asyncio.create_task(vectorstore_manager.flush_periodically())
     
-    # Initialize components (lazy loading will happen on first use)
     logger.info("Application started successfully")
     
     yield
     
     # Shutdown
     logger.info("Shutting down RAG Chatbot API...")
+    startup_task.cancel()
+    if flush_task is not None:
+        flush_task.cancel()
+    if vectorstore_manager is not None:
+        try:
+            vectorstore_manager.flush()
+        except Exception as e:
+            logger.error(f"Error saving vector store on shutdown: {e}")
+    shutdown_chunk_pool()
 
 
 # Initialize FastAPI app
@@ -68,11 +191,11 @@ app = FastAPI(
     title="RAG Chatbot API",
     description="Production-grade chatbot backend using FastAPI + LangChain RAG",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Configure CORS
-settings = get_settings()
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.cors_origins,
@@ -83,10 +206,13 @@ app.add_middleware(
 )
 
 # Mount static files and templates only if not in API-only mode
-templates: Optional[Jinja2Templates] = None
+# The chat page has no per-request content, so it is rendered once here
+# and served as bytes instead of running the template on every visit
+index_html: Optional[bytes] = None
 if not settings.api_only:
     app.mount("/static", StaticFiles(directory="ui/static"), name="static")
     templates = Jinja2Templates(directory="ui/templates")
+    index_html = templates.get_template("index.html").render().encode("utf-8")
     logger.info("UI serving enabled")
 else:
     logger.info("Running in API-only mode (UI disabled)")
@@ -97,50 +223,67 @@ app.include_router(chat.router, tags=["Chat"])
 app.include_router(ingest.router, tags=["Ingestion"])
 
 
-@app.get("/")
-async def root(request: Request):
-    """Root endpoint - Serve the chat UI or API info"""
-    if settings.api_only or templates is None:
-        return {
-            "message": "RAG Chatbot API",
-            "version": "1.0.0",
-            "mode": "API-only",
-            "docs": "/docs",
-            "redoc": "/redoc",
-            "health": "/health",
-            "endpoints": {
-                "chat": "POST /chat",
-                "ingest_text": "POST /ingest/text",
-                "ingest_file": "POST /ingest/file",
-                "ingest_url": "POST /ingest/url"
-            }
-        }
-    return templates.TemplateResponse("index.html", {"request": request})
+# /api and the API-only root return fixed content for a given configuration;
+# serialize it once rather than on every request
+API_INFO_BODY = orjson.dumps({
+    "message": "RAG Chatbot API",
+    "version": "1.0.0",
+    "mode": "API-only" if settings.api_only else "Full (API + UI)",
+    "docs": "/docs",
+    "redoc": "/redoc",
+    "health": "/health",
+    "ui": "/" if not settings.api_only else None
+})
+
+API_ONLY_ROOT_BODY = orjson.dumps({
+    "message": "RAG Chatbot API",
+    "version": "1.0.0",
+    "mode": "API-only",
+    "docs": "/docs",
+    "redoc": "/redoc",
+    "health": "/health",
+    "endpoints": {
+        "chat": "POST /chat",
+        "chat_stream": "POST /chat/stream",
+        "ingest_text": "POST /ingest/text",
+        "ingest_file": "POST /ingest/file",
+        "ingest_url": "POST /ingest/url"
+    }
+})
+
+
+# The mode is fixed for the process, so only the matching root handler is
+# registered instead of checking it on every request
+if settings.api_only:
+    @app.get("/")
+    async def root():
+        """Root endpoint - API info (API-only mode)"""
+        return Response(content=API_ONLY_ROOT_BODY, media_type="application/json")
+else:
+    @app.get("/")
+    async def root():
+        """Root endpoint - Serve the chat UI"""
+        return HTMLResponse(content=index_html, headers=INDEX_CACHE_HEADERS)
 
 
 @app.get("/api")
 async def api_info():
     """API information endpoint"""
-    return {
-        "message": "RAG Chatbot API",
-        "version": "1.0.0",
-        "mode": "API-only" if settings.api_only else "Full (API + UI)",
-        "docs": "/docs",
-        "redoc": "/redoc",
-        "health": "/health",
-        "ui": "/" if not settings.api_only else None
-    }
+    return Response(content=API_INFO_BODY, media_type="application/json")
 
 
 if __name__ == "__main__":
     import uvicorn
     
-    settings = get_settings()
-    
+    # Request explicitly so a missing uvicorn[standard] install fails loudly
+    # instead of silently falling back to the pure-Python loop and parser
+    # (uvloop is not available on Windows)
     uvicorn.run(
         "app.main:app",
         host=settings.host,
         port=settings.port,
         reload=settings.debug,
-        log_level="info"
+        log_level="info",
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools"
     )
@@ -2,14 +2,16 @@
 Chat API Schemas
 Request and response models for chat endpoints
 """
-from typing import List, Optional
-from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class ChatMessage(BaseModel):
     """Single chat message"""
-    role: str = Field(..., description="Message role: 'user' or 'assistant'")
+    role: Literal["user", "assistant", "system"] = Field(..., description="Message role: 'user', 'assistant' or 'system'")
     content: str = Field(..., description="Message content")
+    
+    model_config = ConfigDict(frozen=True)
 
 
 class ChatRequest(BaseModel):
@@ -20,12 +22,13 @@ class ChatRequest(BaseModel):
         description="Session ID for conversation history"
     )
     chat_history: Optional[List[ChatMessage]] = Field(
-        default=[],
+        default_factory=list,
         description="Previous chat messages in the conversation"
     )
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        frozen=True,
+        json_schema_extra={
             "example": {
                 "query": "What is machine learning?",
                 "session_id": "user-123",
@@ -35,6 +38,7 @@ class ChatRequest(BaseModel):
                 ]
             }
         }
+    )
 
 
 class SourceDocument(BaseModel):
@@ -42,13 +46,15 @@ class SourceDocument(BaseModel):
     content: str = Field(..., description="Document content snippet")
     source: str = Field(..., description="Document source")
     page: Optional[int] = Field(default=None, description="Page number if applicable")
+    
+    model_config = ConfigDict(extra="forbid")
 
 
 class ChatResponse(BaseModel):
     """Chat response payload"""
     answer: str = Field(..., description="Chatbot answer")
     sources: List[SourceDocument] = Field(
-        default=[],
+        default_factory=list,
         description="Source documents used to generate the answer"
     )
     session_id: Optional[str] = Field(
@@ -56,8 +62,9 @@ class ChatResponse(BaseModel):
         description="Session ID for the conversation"
     )
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        extra="forbid",
+        json_schema_extra={
             "example": {
                 "answer": "Machine learning is a subset of artificial intelligence...",
                 "sources": [
@@ -70,3 +77,4 @@ class ChatResponse(BaseModel):
                 "session_id": "user-123"
             }
         }
+    )
@@ -3,19 +3,25 @@ Ingestion API Schemas
 Request and response models for document/URL ingestion
 """
 from typing import List, Optional
-from pydantic import BaseModel, Field, HttpUrl
+from pydantic import BaseModel, ConfigDict, Field, HttpUrl
 
 
 class URLIngestRequest(BaseModel):
     """URL ingestion request"""
     url: HttpUrl = Field(..., description="URL to scrape and ingest")
+    async_mode: bool = Field(
+        default=False,
+        description="Return 202 with a job ID immediately and ingest in the background"
+    )
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
-                "url": "https://en.wikipedia.org/wiki/Artificial_intelligence"
+                "url": "https://en.wikipedia.org/wiki/Artificial_intelligence",
+                "async_mode": False
             }
         }
+    )
 
 
 class IngestResponse(BaseModel):
@@ -31,17 +37,48 @@ class IngestResponse(BaseModel):
         description="Number of text chunks created"
     )
     sources: Optional[List[str]] = Field(
-        default=[],
-        description="List of ingested sources"
+        default_factory=list,
+        description="List of ingested sources (truncated to MAX_SOURCES_IN_RESPONSE)"
+    )
+    total_sources: Optional[int] = Field(
+        default=None,
+        description="Total number of ingested sources, including any not listed in sources"
     )
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "status": "success",
                 "message": "Documents ingested successfully",
                 "documents_processed": 3,
                 "chunks_created": 45,
-                "sources": ["document1.pdf", "document2.docx", "document3.txt"]
+                "sources": ["document1.pdf", "document2.docx", "document3.txt"],
+                "total_sources": 3
             }
         }
+    )
+
+
+class IngestJobResponse(BaseModel):
+    """Background ingestion job status"""
+    job_id: str = Field(..., description="Ingestion job ID")
+    status: str = Field(..., description="Job status: 'running', 'completed' or 'failed'")
+    result: Optional[IngestResponse] = Field(
+        default=None,
+        description="Ingestion result once the job has completed"
+    )
+    error: Optional[str] = Field(
+        default=None,
+        description="Error message if the job failed"
+    )
+    
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "job_id": "3f2b8c1e9d4a4f6b8e2a7c5d1f0e9b3a",
+                "status": "running",
+                "result": None,
+                "error": None
+            }
+        }
+    )
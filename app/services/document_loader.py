@@ -2,43 +2,89 @@
 Document Loader Service
 Handles loading and chunking documents from various file formats
 """
-import tempfile
+import io
+import itertools
+import mmap
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import cached_property, lru_cache
 from pathlib import Path
-from typing import List
+from typing import Callable, Iterator, List, Optional, Union
 from langchain_core.documents import Document
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_community.document_loaders import (
-    PyPDFLoader,
-    TextLoader,
-    Docx2txtLoader
-)
 from app.core.config import get_settings
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Upper bound on threads loading files in parallel
+MAX_LOAD_WORKERS = 32
+
+# Raw document content: a memory-mapped file, or b"" for an empty file (which cannot be mapped)
+DocumentBuffer = Union[mmap.mmap, bytes]
+
+
+def _open_mmap(file_path: str) -> mmap.mmap:
+    """
+    Memory-map a file read-only
+    
+    Args:
+        file_path: Path to a non-empty file
+        
+    Returns:
+        mmap over the whole file (usable as a context manager)
+    """
+    with open(file_path, "rb") as f:
+        # The mapping stays valid after the descriptor is closed
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
 
 class DocumentLoaderService:
     """Service for loading and processing documents"""
     
     def __init__(self):
         self.settings = get_settings()
-        self.text_splitter = RecursiveCharacterTextSplitter(
+    
+    @cached_property
+    def text_splitter(self):
+        """Text splitter, built (and its module imported) on first chunking call"""
+        from langchain_text_splitters import RecursiveCharacterTextSplitter
+        
+        return RecursiveCharacterTextSplitter(
             chunk_size=self.settings.chunk_size,
             chunk_overlap=self.settings.chunk_overlap,
             length_function=len,
             separators=["\n\n", "\n", " ", ""]
         )
     
-    def load_file(self, file_path: str) -> List[Document]:
+    def _get_parser(self, file_extension: str) -> Callable[[DocumentBuffer, str], Iterator[Document]]:
         """
-        Load a document from file path
+        Get the parser for a file type
+        
+        Args:
+            file_extension: Lower-case file extension (e.g. ".pdf")
+            
+        Returns:
+            Parser taking the document buffer and its source name
+        """
+        if file_extension == ".pdf":
+            return self._lazy_load_pdf
+        elif file_extension == ".txt":
+            return self._lazy_load_text
+        elif file_extension in [".docx", ".doc"]:
+            return self._lazy_load_docx
+        else:
+            raise ValueError(f"Unsupported file type: {file_extension}")
+    
+    def _lazy_load(self, file_path: str) -> Iterator[Document]:
+        """
+        Read a document page by page based on its extension
         
         Args:
             file_path: Path to the document file
             
         Returns:
-            List of Document objects
+            Iterator of Document objects (one per page for PDFs)
         """
         path = Path(file_path)
         
@@ -46,23 +92,101 @@ class DocumentLoaderService:
             raise FileNotFoundError(f"File not found: {file_path}")
         
         file_extension = path.suffix.lower()
+        parse = self._get_parser(file_extension)
+        logger.info(f"Loading file: {file_path} (type: {file_extension})")
+        
+        return self._lazy_load_mapped(file_path, parse)
+    
+    def _lazy_load_mapped(
+        self,
+        file_path: str,
+        parse: Callable[[DocumentBuffer, str], Iterator[Document]]
+    ) -> Iterator[Document]:
+        """Run a parser over a read-only memory map of a file"""
+        # Files are parsed straight from the page cache instead of being read()
+        # into a bytes copy first
+        if os.path.getsize(file_path) == 0:
+            # Empty files cannot be mapped
+            yield from parse(b"", file_path)
+            return
+        
+        with _open_mmap(file_path) as mm:
+            yield from parse(mm, file_path)
+    
+    def _lazy_load_pdf(self, buffer: DocumentBuffer, source: str) -> Iterator[Document]:
+        """Yield one Document per page of a PDF"""
+        from pypdf import PdfReader
+        
+        # A memory map is already a seekable stream; bytes need a wrapper
+        reader = PdfReader(buffer if isinstance(buffer, mmap.mmap) else io.BytesIO(buffer))
+        total_pages = len(reader.pages)
         
+        for page_number, page in enumerate(reader.pages):
+            yield Document(
+                page_content=page.extract_text(),
+                metadata={"source": source, "page": page_number, "total_pages": total_pages}
+            )
+    
+    def _lazy_load_text(self, buffer: DocumentBuffer, source: str) -> Iterator[Document]:
+        """Yield a UTF-8 text file as a single Document"""
+        # One decode over the whole buffer; invalid bytes become U+FFFD instead
+        # of failing the file
+        yield Document(page_content=str(buffer, "utf-8", "replace"), metadata={"source": source})
+    
+    def _lazy_load_docx(self, buffer: DocumentBuffer, source: str) -> Iterator[Document]:
+        """Yield a Word document as a single Document"""
+        # Imported per format so a process only pays for the parsers it uses
+        import docx2txt
+        
+        # zipfile needs a file object with seekable(), which mmap lacks
+        yield Document(page_content=docx2txt.process(io.BytesIO(buffer)), metadata={"source": source})
+    
+    def load_file(self, file_path: str) -> List[Document]:
+        """
+        Load a document from file path
+        
+        Args:
+            file_path: Path to the document file
+            
+        Returns:
+            List of Document objects
+        """
         try:
-            logger.info(f"Loading file: {file_path} (type: {file_extension})")
+            documents = list(self._lazy_load(file_path))
+            logger.info(f"Loaded {len(documents)} document(s) from {Path(file_path).name}")
             
-            if file_extension == ".pdf":
-                loader = PyPDFLoader(file_path)
-            elif file_extension == ".txt":
-                loader = TextLoader(file_path, encoding="utf-8")
-            elif file_extension in [".docx", ".doc"]:
-                loader = Docx2txtLoader(file_path)
-            else:
-                raise ValueError(f"Unsupported file type: {file_extension}")
+            return documents
             
-            documents = loader.load()
-            logger.info(f"Loaded {len(documents)} document(s) from {path.name}")
+        except Exception as e:
+            logger.error(f"Error loading file {file_path}: {e}")
+            raise
+    
+    def load_and_chunk_file(self, file_path: str, source: Optional[str] = None) -> List[Document]:
+        """
+        Load a document page by page and chunk each page as it is read
+        
+        Only one page is held at a time instead of the whole document next to
+        its chunks; the chunks are the same as chunk_documents(load_file(...)).
+        
+        Args:
+            file_path: Path to the document file
+            source: Value for the chunks' "source" metadata (default: keep the loader's)
             
-            return documents
+        Returns:
+            List of chunked Document objects
+        """
+        try:
+            chunks = []
+            pages = 0
+            
+            for page in self._lazy_load(file_path):
+                if source is not None:
+                    page.metadata["source"] = source
+                chunks.extend(self.text_splitter.split_documents([page]))
+                pages += 1
+            
+            logger.info(f"Created {len(chunks)} chunks from {pages} page(s) of {Path(file_path).name}")
+            return chunks
             
         except Exception as e:
             logger.error(f"Error loading file {file_path}: {e}")
@@ -78,19 +202,28 @@ class DocumentLoaderService:
         Returns:
             Combined list of Document objects
         """
-        all_documents = []
+        if not file_paths:
+            return []
         
-        for file_path in file_paths:
-            try:
-                documents = self.load_file(file_path)
-                all_documents.extend(documents)
-            except Exception as e:
-                logger.error(f"Failed to load {file_path}: {e}")
-                # Continue with other files
+        # Files are independent; overlap their reads (and any parsing that
+        # releases the GIL) across threads. map keeps the input order.
+        max_workers = min(MAX_LOAD_WORKERS, len(file_paths), os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(self._safe_load_file, file_paths)
+            all_documents = list(itertools.chain.from_iterable(results))
         
         logger.info(f"Loaded total of {len(all_documents)} documents from {len(file_paths)} files")
         return all_documents
     
+    def _safe_load_file(self, file_path: str) -> List[Document]:
+        """Load a file, logging and returning no documents if it fails"""
+        try:
+            return self.load_file(str(file_path))
+        except Exception as e:
+            logger.error(f"Failed to load {file_path}: {e}")
+            # Continue with other files
+            return []
+    
     def load_from_folder(self, folder_path: str) -> List[Document]:
         """
         Load all supported documents from a folder
@@ -124,16 +257,7 @@ class DocumentLoaderService:
         logger.info(f"Found {len(file_paths)} document(s) in {folder_path}")
         
         # Load all documents
-        all_documents = []
-        for file_path in file_paths:
-            try:
-                documents = self.load_file(str(file_path))
-                all_documents.extend(documents)
-                logger.info(f"Loaded: {file_path.name}")
-            except Exception as e:
-                logger.error(f"Failed to load {file_path.name}: {e}")
-        
-        return all_documents
+        return self.load_multiple_files([str(file_path) for file_path in file_paths])
     
     def chunk_documents(self, documents: List[Document]) -> List[Document]:
         """
@@ -159,45 +283,19 @@ class DocumentLoaderService:
             logger.error(f"Error chunking documents: {e}")
             raise
     
-    def process_uploaded_file(self, file_content: bytes, filename: str) -> List[Document]:
+    def process_uploaded_path(self, file_path: str, filename: str) -> List[Document]:
         """
-        Process an uploaded file from FastAPI
+        Process an uploaded file that has already been streamed to disk
         
         Args:
-            file_content: File content as bytes
+            file_path: Path to the temporary file holding the upload
             filename: Original filename
             
         Returns:
             List of chunked Document objects
         """
-        # Create temporary file
-        file_extension = Path(filename).suffix
-        
-        with tempfile.NamedTemporaryFile(
-            delete=False,
-            suffix=file_extension
-        ) as temp_file:
-            temp_file.write(file_content)
-            temp_file_path = temp_file.name
-        
-        try:
-            # Load and chunk the document
-            documents = self.load_file(temp_file_path)
-            
-            # Add source metadata
-            for doc in documents:
-                doc.metadata["source"] = filename
-            
-            chunks = self.chunk_documents(documents)
-            
-            return chunks
-            
-        finally:
-            # Clean up temporary file
-            try:
-                Path(temp_file_path).unlink()
-            except Exception as e:
-                logger.warning(f"Could not delete temporary file: {e}")
+        # Load and chunk the document, tagging chunks with the original filename
+        return self.load_and_chunk_file(file_path, source=filename)
     
     def process_text(self, text: str, source: str = "manual_input") -> List[Document]:
         """
@@ -228,15 +326,68 @@ class DocumentLoaderService:
             raise
 
 
-# Global loader instance
-_document_loader: DocumentLoaderService = None
-
-
+# Global loader instance (also looked up per task inside chunking workers)
+@lru_cache(maxsize=1)
 def get_document_loader() -> DocumentLoaderService:
     """Get or create the global DocumentLoaderService instance"""
-    global _document_loader
+    return DocumentLoaderService()
+
+
+def process_uploaded_path_in_worker(file_path: str, filename: str) -> List[Document]:
+    """
+    Chunk an uploaded file inside a chunking worker process
+    
+    Module-level so it can be pickled by ProcessPoolExecutor; each worker
+    process builds its own DocumentLoaderService on first use.
+    
+    Args:
+        file_path: Path to the temporary file holding the upload
+        filename: Original filename
+        
+    Returns:
+        List of chunked Document objects
+    """
+    return get_document_loader().process_uploaded_path(file_path, filename)
+
+
+def chunk_documents_in_worker(documents: List[Document]) -> List[Document]:
+    """
+    Split already-loaded documents inside a chunking worker process
     
-    if _document_loader is None:
-        _document_loader = DocumentLoaderService()
+    Args:
+        documents: List of Document objects (e.g. scraped web pages)
+        
+    Returns:
+        List of chunked Document objects
+    """
+    return get_document_loader().chunk_documents(documents)
+
+
+# Global chunking process pool
+_chunk_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_chunk_pool() -> ProcessPoolExecutor:
+    """Get or create the process pool used for CPU-bound parsing and chunking"""
+    global _chunk_pool
+    
+    if _chunk_pool is None:
+        max_workers = get_settings().chunk_workers or os.cpu_count()
+        # "spawn" avoids forking a process that already runs FAISS/OpenMP threads
+        _chunk_pool = ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+        logger.info(f"Started chunking process pool with {max_workers} workers")
+    
+    return _chunk_pool
+
+
+def shutdown_chunk_pool():
+    """Shut down the chunking process pool if it was started"""
+    global _chunk_pool
     
-    return _document_loader
+    if _chunk_pool is not None:
+        _chunk_pool.shutdown(wait=False, cancel_futures=True)
+        _chunk_pool = None
+        logger.info("Chunking process pool shut down")
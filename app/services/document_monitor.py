@@ -2,11 +2,16 @@
 Document Folder Monitor Service
 Automatically monitors and processes new documents from the documents folder
 """
-import json
 import hashlib
+import mmap
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
 from typing import Dict, Set, List
 from datetime import datetime
+import orjson
 from app.core.config import get_settings
 from app.services.document_loader import get_document_loader
 from app.core.vectorstore import get_vectorstore_manager
@@ -14,6 +19,17 @@ from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# File types picked up from the documents folder
+SUPPORTED_EXTENSIONS = (".pdf", ".txt", ".docx", ".doc")
+
+# Maximum number of files hashed concurrently when scanning the folder
+HASH_WORKERS = 16
+
+# SHA-256 runs on the CPU's SHA extensions through OpenSSL, faster than MD5;
+# entries without an "algo" field were hashed with LEGACY_HASH_ALGORITHM
+HASH_ALGORITHM = "sha256"
+LEGACY_HASH_ALGORITHM = "md5"
+
 
 class DocumentMonitor:
     """Service for monitoring and auto-processing documents from folder"""
@@ -21,15 +37,21 @@ class DocumentMonitor:
     def __init__(self):
         self.settings = get_settings()
         self.tracking_file = Path(self.settings.documents_folder) / ".processed_files.json"
-        self.processed_files: Dict[str, str] = {}
+        # File name -> {"size", "mtime_ns", "hash", "algo"} of the version last processed
+        self.processed_files: Dict[str, Dict] = {}
+        # Records built by the last folder scan, reused when recording processed files
+        self.scanned_records: Dict[Path, Dict] = {}
+        # The startup scan runs in the background and may overlap with /ingest/folder
+        self._process_lock = threading.Lock()
+        # Files loaded so far in the current (or last) processing run
+        self.progress: Dict[str, int] = {"files_total": 0, "files_loaded": 0}
         self.load_tracking_data()
     
     def load_tracking_data(self):
         """Load tracking data of previously processed files"""
         if self.tracking_file.exists():
             try:
-                with open(self.tracking_file, 'r') as f:
-                    self.processed_files = json.load(f)
+                self.processed_files = orjson.loads(self.tracking_file.read_bytes())
                 logger.info(f"Loaded tracking data: {len(self.processed_files)} files previously processed")
             except Exception as e:
                 logger.error(f"Error loading tracking file: {e}")
@@ -43,25 +65,159 @@ class DocumentMonitor:
             # Ensure documents folder exists
             Path(self.settings.documents_folder).mkdir(parents=True, exist_ok=True)
             
-            with open(self.tracking_file, 'w') as f:
-                json.dump(self.processed_files, f, indent=2)
+            # Write a temporary file and swap it in so a crash mid-write
+            # cannot leave a truncated tracking file behind
+            tmp_file = self.tracking_file.with_name(self.tracking_file.name + ".tmp")
+            tmp_file.write_bytes(orjson.dumps(self.processed_files))
+            os.replace(tmp_file, self.tracking_file)
             logger.debug("Tracking data saved")
         except Exception as e:
             logger.error(f"Error saving tracking file: {e}")
     
-    def get_file_hash(self, file_path: Path) -> str:
+    def get_file_hash(self, file_path: Path, algorithm: str = HASH_ALGORITHM) -> str:
         """Calculate hash of file for change detection"""
         try:
-            hasher = hashlib.md5()
             with open(file_path, 'rb') as f:
-                # Read in chunks for large files
-                for chunk in iter(lambda: f.read(4096), b""):
-                    hasher.update(chunk)
-            return hasher.hexdigest()
+                if os.fstat(f.fileno()).st_size == 0:
+                    # Empty files cannot be mapped
+                    return hashlib.file_digest(f, algorithm).hexdigest()
+                
+                # Hash the page cache in place with one update call (which releases
+                # the GIL) instead of copying the file through a read buffer
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    if hasattr(mm, "madvise"):
+                        mm.madvise(mmap.MADV_SEQUENTIAL)
+                    return hashlib.new(algorithm, mm).hexdigest()
         except Exception as e:
             logger.error(f"Error calculating hash for {file_path}: {e}")
             return ""
     
+    def get_file_hashes(self, file_paths: List[Path], algorithm: str = HASH_ALGORITHM) -> Dict[Path, str]:
+        """
+        Hash several files concurrently so their disk reads overlap
+        
+        Args:
+            file_paths: Files to hash
+            algorithm: hashlib algorithm name
+            
+        Returns:
+            Dictionary mapping each path to its hash ("" if it could not be read)
+        """
+        if not file_paths:
+            return {}
+        
+        with ThreadPoolExecutor(max_workers=min(HASH_WORKERS, len(file_paths))) as executor:
+            hashes = executor.map(partial(self.get_file_hash, algorithm=algorithm), file_paths)
+            return dict(zip(file_paths, hashes))
+    
+    @staticmethod
+    def _tracked_hash(entry) -> str:
+        """Get the hash from a tracking entry (a bare hash string in older tracking files)"""
+        return entry if isinstance(entry, str) else entry.get("hash", "")
+    
+    @staticmethod
+    def _tracked_algorithm(entry) -> str:
+        """Get the hash algorithm of a tracking entry"""
+        return entry.get("algo", LEGACY_HASH_ALGORITHM) if isinstance(entry, dict) else LEGACY_HASH_ALGORITHM
+    
+    def _get_legacy_hashes(self, file_records: Dict[Path, Dict]) -> Dict[Path, str]:
+        """
+        Hash files tracked before the algorithm changed with their old algorithm,
+        so they can be compared against the tracked hash
+        
+        Args:
+            file_records: Records built by the current scan
+            
+        Returns:
+            Dictionary mapping each such path to its hash under the tracked algorithm
+        """
+        by_algorithm: Dict[str, List[Path]] = {}
+        for file_path, record in file_records.items():
+            tracked = self.processed_files.get(file_path.name)
+            if record["hash"] and tracked is not None:
+                algorithm = self._tracked_algorithm(tracked)
+                if algorithm != HASH_ALGORITHM:
+                    by_algorithm.setdefault(algorithm, []).append(file_path)
+        
+        legacy_hashes = {}
+        for algorithm, file_paths in by_algorithm.items():
+            legacy_hashes.update(self.get_file_hashes(file_paths, algorithm))
+        
+        return legacy_hashes
+    
+    def _is_modified(self, file_path: Path, record: Dict, legacy_hashes: Dict[Path, str]) -> bool:
+        """Check whether a tracked file's content differs from the processed version"""
+        tracked = self.processed_files[file_path.name]
+        
+        if self._tracked_algorithm(tracked) == HASH_ALGORITHM:
+            current_hash = record["hash"]
+        else:
+            current_hash = legacy_hashes[file_path]
+        
+        return current_hash != self._tracked_hash(tracked)
+    
+    def list_document_files(self, folder: Path) -> Dict[Path, os.stat_result]:
+        """
+        List the supported files in a folder in a single directory pass
+        
+        Args:
+            folder: Folder to list
+            
+        Returns:
+            Dictionary mapping each file's path to its stat result
+        """
+        if not folder.exists():
+            return {}
+        
+        files = {}
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                if not entry.name.lower().endswith(SUPPORTED_EXTENSIONS):
+                    continue
+                try:
+                    if entry.is_file():
+                        files[Path(entry.path)] = entry.stat()
+                except OSError as e:
+                    logger.error(f"Error reading file information for {entry.path}: {e}")
+        
+        return files
+    
+    def get_file_records(self, file_stats: Dict[Path, os.stat_result]) -> Dict[Path, Dict]:
+        """
+        Build tracking records for files, hashing only those whose size or
+        modification time differs from the processed version
+        
+        Args:
+            file_stats: Files to describe, with their stat results
+            
+        Returns:
+            Dictionary mapping each path to its {"size", "mtime_ns", "hash", "algo"} record
+        """
+        records = {}
+        to_hash = []
+        
+        for file_path, stat in file_stats.items():
+            record = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "hash": "", "algo": HASH_ALGORITHM}
+            tracked = self.processed_files.get(file_path.name)
+            
+            if (
+                isinstance(tracked, dict)
+                and self._tracked_algorithm(tracked) == HASH_ALGORITHM
+                and tracked.get("size") == record["size"]
+                and tracked.get("mtime_ns") == record["mtime_ns"]
+            ):
+                # Unchanged since it was processed; skip reading the file
+                record["hash"] = tracked.get("hash", "")
+            else:
+                to_hash.append(file_path)
+            
+            records[file_path] = record
+        
+        for file_path, file_hash in self.get_file_hashes(to_hash).items():
+            records[file_path]["hash"] = file_hash
+        
+        return records
+    
     def scan_for_new_documents(self) -> List[Path]:
         """
         Scan documents folder for new or modified files
@@ -76,19 +232,15 @@ class DocumentMonitor:
             folder.mkdir(parents=True, exist_ok=True)
             return []
         
-        # Supported file extensions
-        supported_extensions = [".pdf", ".txt", ".docx", ".doc"]
-        
-        # Find all supported files
-        all_files = []
-        for ext in supported_extensions:
-            all_files.extend(folder.glob(f"*{ext}"))
-        
         # Filter for new or modified files
         new_or_modified = []
-        for file_path in all_files:
+        refreshed = False
+        file_records = self.get_file_records(self.list_document_files(folder))
+        self.scanned_records = file_records
+        legacy_hashes = self._get_legacy_hashes(file_records)
+        for file_path, record in file_records.items():
             file_str = str(file_path.name)
-            current_hash = self.get_file_hash(file_path)
+            current_hash = record["hash"]
             
             if not current_hash:
                 continue
@@ -97,9 +249,17 @@ class DocumentMonitor:
             if file_str not in self.processed_files:
                 logger.info(f"New document found: {file_path.name}")
                 new_or_modified.append(file_path)
-            elif self.processed_files[file_str] != current_hash:
+            elif self._is_modified(file_path, record, legacy_hashes):
                 logger.info(f"Modified document found: {file_path.name}")
                 new_or_modified.append(file_path)
+            elif self.processed_files[file_str] != record:
+                # Same content but touched (or an older entry): store the new
+                # record so the next scan can skip hashing it
+                self.processed_files[file_str] = record
+                refreshed = True
+        
+        if refreshed and not new_or_modified:
+            self.save_tracking_data()
         
         return new_or_modified
     
@@ -111,6 +271,11 @@ class DocumentMonitor:
         Returns:
             Dictionary with processing statistics
         """
+        with self._process_lock:
+            return self._process_new_documents()
+    
+    def _process_new_documents(self) -> Dict:
+        """Process new or modified documents (caller holds the process lock)"""
         try:
             new_files = self.scan_for_new_documents()
             
@@ -142,26 +307,27 @@ class DocumentMonitor:
             all_chunks = []
             processed_files = []
             
+            self.progress = {"files_total": len(new_files), "files_loaded": 0}
             for file_path in new_files:
                 try:
                     logger.info(f"Processing: {file_path.name}")
                     
                     # Load and chunk the document
-                    documents = document_loader.load_file(str(file_path))
-                    chunks = document_loader.chunk_documents(documents)
+                    chunks = document_loader.load_and_chunk_file(str(file_path))
                     
                     all_chunks.extend(chunks)
                     processed_files.append(file_path.name)
                     
-                    # Update tracking
-                    file_hash = self.get_file_hash(file_path)
-                    self.processed_files[file_path.name] = file_hash
+                    # Update tracking with the record built by the scan
+                    self.processed_files[file_path.name] = self.scanned_records[file_path]
                     
                     logger.info(f"Created {len(chunks)} chunks from {file_path.name}")
                     
                 except Exception as e:
                     logger.error(f"Error processing {file_path.name}: {e}")
                     continue
+                finally:
+                    self.progress["files_loaded"] += 1
             
             if not all_chunks:
                 return {
@@ -175,6 +341,9 @@ class DocumentMonitor:
             # Add to vector store
             num_added = vectorstore_manager.add_documents(all_chunks)
             
+            # Persist the index before recording the files as processed
+            vectorstore_manager.flush()
+            
             # Save tracking data
             self.save_tracking_data()
             
@@ -205,13 +374,9 @@ class DocumentMonitor:
         Used when documents are modified to avoid conflicts with old data
         """
         try:
-            folder = Path(self.settings.documents_folder)
-            supported_extensions = [".pdf", ".txt", ".docx", ".doc"]
-            
             # Find all supported files
-            all_files = []
-            for ext in supported_extensions:
-                all_files.extend(folder.glob(f"*{ext}"))
+            file_stats = self.list_document_files(Path(self.settings.documents_folder))
+            all_files = list(file_stats)
             
             if not all_files:
                 logger.info("No documents found for rebuild")
@@ -230,23 +395,34 @@ class DocumentMonitor:
             
             all_chunks = []
             processed_files = []
+            # Only files the scan did not see (e.g. added since) need describing
+            file_records = self.get_file_records({
+                file_path: stat for file_path, stat in file_stats.items()
+                if file_path not in self.scanned_records
+            })
+            file_records.update(
+                (file_path, self.scanned_records[file_path])
+                for file_path in all_files if file_path in self.scanned_records
+            )
             
             # Process all documents
+            self.progress = {"files_total": len(all_files), "files_loaded": 0}
             for file_path in all_files:
                 try:
                     logger.info(f"Loading: {file_path.name}")
-                    documents = document_loader.load_file(str(file_path))
-                    chunks = document_loader.chunk_documents(documents)
+                    chunks = document_loader.load_and_chunk_file(str(file_path))
                     all_chunks.extend(chunks)
                     processed_files.append(file_path.name)
                     
-                    # Update tracking with current hash
-                    file_hash = self.get_file_hash(file_path)
-                    self.processed_files[file_path.name] = file_hash
+                    # Update tracking with the current record
+                    if file_path in file_records:
+                        self.processed_files[file_path.name] = file_records[file_path]
                     
                 except Exception as e:
                     logger.error(f"Error loading {file_path.name}: {e}")
                     continue
+                finally:
+                    self.progress["files_loaded"] += 1
             
             if not all_chunks:
                 return {
@@ -262,6 +438,9 @@ class DocumentMonitor:
             vectorstore_manager.reset()  # Clear existing index
             num_added = vectorstore_manager.add_documents(all_chunks)
             
+            # Persist the index before recording the files as processed
+            vectorstore_manager.flush()
+            
             # Save tracking data
             self.save_tracking_data()
             
@@ -0,0 +1,94 @@
+"""
+Ingestion Job Service
+Runs ingestion work as background tasks and tracks their status for polling
+"""
+import asyncio
+import uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Dict, Optional, Set
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class IngestJobManager:
+    """Tracks ingestion jobs running as background asyncio tasks"""
+    
+    def __init__(self, max_jobs: int = 1000):
+        self.max_jobs = max_jobs
+        self.jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # Strong references so running tasks are not garbage collected
+        self._tasks: Set[asyncio.Task] = set()
+    
+    def submit(self, work: Awaitable[Any]) -> str:
+        """
+        Schedule ingestion work in the background
+        
+        Args:
+            work: Awaitable performing the ingestion; its result is stored on the job
+            
+        Returns:
+            ID of the created job
+        """
+        job_id = uuid.uuid4().hex
+        self.jobs[job_id] = {
+            "job_id": job_id,
+            "status": "running",
+            "result": None,
+            "error": None
+        }
+        
+        task = asyncio.create_task(self._run(job_id, work))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        
+        self._prune()
+        logger.info(f"Started ingestion job {job_id}")
+        return job_id
+    
+    async def _run(self, job_id: str, work: Awaitable[Any]):
+        """Await the job's work and record its outcome"""
+        job = self.jobs[job_id]
+        
+        try:
+            job["result"] = await work
+            job["status"] = "completed"
+            logger.info(f"Ingestion job {job_id} completed")
+        except Exception as e:
+            job["status"] = "failed"
+            job["error"] = str(getattr(e, "detail", e))
+            logger.error(f"Ingestion job {job_id} failed: {job['error']}")
+    
+    def _prune(self):
+        """Forget the oldest finished jobs once more than max_jobs are tracked"""
+        for job_id in list(self.jobs):
+            if len(self.jobs) <= self.max_jobs:
+                break
+            if self.jobs[job_id]["status"] != "running":
+                del self.jobs[job_id]
+    
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the status of a job
+        
+        Args:
+            job_id: Job ID returned by submit
+            
+        Returns:
+            Job status dictionary, or None if the job is unknown
+        """
+        return self.jobs.get(job_id)
+
+
+# Global job manager instance
+_ingest_job_manager: IngestJobManager = None
+
+
+def get_ingest_job_manager() -> IngestJobManager:
+    """Get or create the global IngestJobManager instance"""
+    global _ingest_job_manager
+    
+    if _ingest_job_manager is None:
+        _ingest_job_manager = IngestJobManager()
+    
+    return _ingest_job_manager
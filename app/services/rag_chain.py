@@ -2,11 +2,15 @@
 RAG Chain Service
 Implements the conversational retrieval chain for question answering
 """
-from typing import List, Dict, Tuple, Optional
+from typing import Iterable, Iterator, List, Dict, Tuple, Optional
 from langchain_classic.chains import ConversationalRetrievalChain
+from langchain_classic.chains.conversational_retrieval.prompts import CONDENSE_QUESTION_PROMPT
 from langchain_classic.memory import ConversationBufferMemory
+from langchain_core.documents import Document
 from langchain_core.messages import HumanMessage, AIMessage
-from app.core.llm import get_llm
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import ChatPromptTemplate, PromptTemplate
+from app.core.llm import get_llm, get_system_prompt
 from app.core.vectorstore import get_vectorstore_manager
 from app.core.config import get_settings
 from app.schemas.chat_schema import ChatMessage, SourceDocument
@@ -14,6 +18,38 @@ from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Answer prompt for the retrieval chain, keyed by allow_general_knowledge
+_ANSWER_TEMPLATES = {
+    True: """Use the following pieces of context to answer the question at the end. 
+
+Read the context carefully and extract specific information requested in the question.
+If the answer is in the context, provide it directly and concisely in English.
+If you cannot find the answer in the context, use your general knowledge to provide a helpful answer.
+
+IMPORTANT: Always respond in English language only.
+
+Context:
+{context}
+
+Question: {question}
+
+Answer in English:""",
+    False: """Use the following pieces of context to answer the question at the end. 
+
+Read the context carefully and extract specific information requested in the question.
+If the answer is in the context, provide it directly and concisely in English.
+If you cannot find the answer in the context, say "I don't know" - do not make up an answer.
+
+IMPORTANT: Always respond in English language only.
+
+Context:
+{context}
+
+Question: {question}
+
+Answer in English:""",
+}
+
 
 class RAGChainService:
     """Service for RAG-based question answering with conversational memory"""
@@ -23,6 +59,24 @@ class RAGChainService:
         self.vectorstore_manager = get_vectorstore_manager()
         self.sessions: Dict[str, ConversationBufferMemory] = {}
         self.settings = get_settings()
+        # Chains are reused across queries and rebuilt only when the vector
+        # store object changes (e.g. created by the first ingest or after a reset)
+        self._qa_chain: Optional[ConversationalRetrievalChain] = None
+        self._session_chains: Dict[str, ConversationalRetrievalChain] = {}
+        
+        # Prompts depend only on settings, so they are built once here
+        self.answer_prompt = PromptTemplate(
+            template=_ANSWER_TEMPLATES[bool(self.settings.allow_general_knowledge)],
+            input_variables=["context", "question"]
+        )
+        # Used when no documents have been ingested yet
+        self.general_knowledge_chain = ChatPromptTemplate.from_messages([
+            ("system", get_system_prompt(True) + "\n\nNo documents are available, so please answer using your general knowledge."),
+            ("user", "{question}")
+        ]) | self.llm | StrOutputParser()
+        # Token-streaming counterparts of the retrieval chain's steps
+        self.answer_chain = self.answer_prompt | self.llm | StrOutputParser()
+        self.condense_question_chain = CONDENSE_QUESTION_PROMPT | self.llm | StrOutputParser()
     
     def _get_or_create_memory(self, session_id: str) -> ConversationBufferMemory:
         """Get or create conversation memory for a session"""
@@ -36,18 +90,127 @@ class RAGChainService:
         
         return self.sessions[session_id]
     
+    @staticmethod
+    def _pair_turns(turns: Iterable[Tuple[str, str]]) -> List[tuple]:
+        """
+        Pair each user message with the assistant reply that follows it
+        
+        Args:
+            turns: (role, content) pairs in conversation order
+            
+        Returns:
+            List of (question, answer) tuples; answer is "" if there was no reply
+        """
+        pairs = []
+        question = None
+        answer = ""
+        
+        for role, content in turns:
+            if role == "user":
+                if question is not None:
+                    pairs.append((question, answer))
+                question, answer = content, ""
+            elif role == "assistant" and question is not None:
+                # The last reply before the next question wins
+                answer = content
+        
+        if question is not None:
+            pairs.append((question, answer))
+        
+        return pairs
+    
     def _format_chat_history(self, chat_history: List[ChatMessage]) -> List[tuple]:
         """Convert ChatMessage list to LangChain format"""
-        formatted_history = []
+        return self._pair_turns((msg.role, msg.content) for msg in chat_history)
+    
+    def _memory_history(self, memory: ConversationBufferMemory) -> List[tuple]:
+        """Convert a session's stored messages to (question, answer) tuples"""
+        return self._pair_turns(
+            (
+                "user" if isinstance(message, HumanMessage)
+                else "assistant" if isinstance(message, AIMessage)
+                else message.type,
+                message.content
+            )
+            for message in memory.chat_memory.messages
+        )
+    
+    @staticmethod
+    def _to_sources(source_docs: List[Document]) -> List[SourceDocument]:
+        """Convert retrieved documents to response sources"""
+        return [
+            SourceDocument(
+                content=doc.page_content[:500],  # Limit content length
+                source=doc.metadata.get("source", "unknown"),
+                page=doc.metadata.get("page", None)
+            )
+            for doc in source_docs
+        ]
+    
+    def _is_current(self, qa_chain: Optional[ConversationalRetrievalChain]) -> bool:
+        """Check whether a cached chain still retrieves from the current vector store"""
+        return qa_chain is not None and qa_chain.retriever.vectorstore is self.vectorstore_manager.vectorstore
+    
+    def _get_qa_chain(self) -> Optional[ConversationalRetrievalChain]:
+        """
+        Get the stateless question answering chain, building it on first use
+        
+        Returns:
+            ConversationalRetrievalChain with the custom answer prompt,
+            or None if no documents have been ingested
+        """
+        if self._is_current(self._qa_chain):
+            return self._qa_chain
+        
+        retriever = self.vectorstore_manager.get_retriever()
+        if retriever is None:
+            return None
         
-        for msg in chat_history:
-            if msg.role == "user":
-                formatted_history.append((msg.content, ""))
-            elif msg.role == "assistant" and formatted_history:
-                # Add to the last tuple
-                formatted_history[-1] = (formatted_history[-1][0], msg.content)
+        # Create conversational chain with custom prompt
+        qa_chain = ConversationalRetrievalChain.from_llm(
+            llm=self.llm,
+            retriever=retriever,
+            return_source_documents=True,
+            verbose=False,
+            chain_type="stuff",  # "stuff" method passes all context at once
+            combine_docs_chain_kwargs={"prompt": self.answer_prompt}
+        )
+        self._qa_chain = qa_chain
         
-        return formatted_history
+        return qa_chain
+    
+    def _get_session_chain(self, session_id: str) -> Optional[ConversationalRetrievalChain]:
+        """
+        Get the chain bound to a session's memory, building it on first use
+        
+        Args:
+            session_id: Session ID for conversation tracking
+            
+        Returns:
+            ConversationalRetrievalChain with the session's memory,
+            or None if no documents have been ingested
+        """
+        qa_chain = self._session_chains.get(session_id)
+        
+        if not self._is_current(qa_chain):
+            retriever = self.vectorstore_manager.get_retriever()
+            if retriever is None:
+                return None
+            
+            memory = self._get_or_create_memory(session_id)
+            
+            # Create conversational chain with memory
+            qa_chain = ConversationalRetrievalChain.from_llm(
+                llm=self.llm,
+                retriever=retriever,
+                memory=memory,
+                return_source_documents=True,
+                verbose=False,
+                chain_type="stuff"
+            )
+            self._session_chains[session_id] = qa_chain
+        
+        return qa_chain
     
     def query(
         self,
@@ -67,23 +230,13 @@ class RAGChainService:
             Tuple of (answer, source_documents)
         """
         try:
-            # Get retriever
-            retriever = self.vectorstore_manager.get_retriever()
+            qa_chain = self._get_qa_chain()
             
-            if retriever is None:
+            if qa_chain is None:
                 if self.settings.allow_general_knowledge:
                     logger.warning("No documents in vector store, using general knowledge")
                     # Use LLM directly without retrieval
-                    from langchain_core.prompts import ChatPromptTemplate
-                    from langchain_core.output_parsers import StrOutputParser
-                    
-                    system_prompt = get_system_prompt(True)
-                    prompt = ChatPromptTemplate.from_messages([
-                        ("system", system_prompt + "\n\nNo documents are available, so please answer using your general knowledge."),
-                        ("user", "{question}")
-                    ])
-                    chain = prompt | self.llm | StrOutputParser()
-                    answer = chain.invoke({"question": question})
+                    answer = self.general_knowledge_chain.invoke({"question": question})
                     return answer, []
                 else:
                     logger.warning("No documents in vector store and general knowledge disabled")
@@ -91,56 +244,6 @@ class RAGChainService:
             
             logger.info(f"Processing query: {question[:100]}...")
             
-            # Create custom prompt for better answer extraction
-            from langchain_core.prompts import PromptTemplate
-            
-            # Check if general knowledge is allowed
-            if self.settings.allow_general_knowledge:
-                prompt_template = """Use the following pieces of context to answer the question at the end. 
-
-Read the context carefully and extract specific information requested in the question.
-If the answer is in the context, provide it directly and concisely in English.
-If you cannot find the answer in the context, use your general knowledge to provide a helpful answer.
-
-IMPORTANT: Always respond in English language only.
-
-Context:
-{context}
-
-Question: {question}
-
-Answer in English:"""
-            else:
-                prompt_template = """Use the following pieces of context to answer the question at the end. 
-
-Read the context carefully and extract specific information requested in the question.
-If the answer is in the context, provide it directly and concisely in English.
-If you cannot find the answer in the context, say "I don't know" - do not make up an answer.
-
-IMPORTANT: Always respond in English language only.
-
-Context:
-{context}
-
-Question: {question}
-
-Answer in English:"""
-            
-            PROMPT = PromptTemplate(
-                template=prompt_template,
-                input_variables=["context", "question"]
-            )
-            
-            # Create conversational chain with custom prompt
-            qa_chain = ConversationalRetrievalChain.from_llm(
-                llm=self.llm,
-                retriever=retriever,
-                return_source_documents=True,
-                verbose=False,
-                chain_type="stuff",  # "stuff" method passes all context at once
-                combine_docs_chain_kwargs={"prompt": PROMPT}
-            )
-            
             # Format chat history
             formatted_history = []
             if chat_history:
@@ -157,18 +260,12 @@ Answer in English:"""
             
             # Log retrieved documents for monitoring
             logger.info(f"Retrieved {len(source_docs)} documents from vector store")
+            # Debug level with lazy formatting: the preview is only built when debug logging is on
             for i, doc in enumerate(source_docs[:2], 1):
-                logger.info(f"Doc {i} preview: {doc.page_content[:100]}...")
+                logger.debug("Doc %d preview: %.100s...", i, doc.page_content)
             
             # Format source documents
-            sources = []
-            for doc in source_docs:
-                source = SourceDocument(
-                    content=doc.page_content[:500],  # Limit content length
-                    source=doc.metadata.get("source", "unknown"),
-                    page=doc.metadata.get("page", None)
-                )
-                sources.append(source)
+            sources = self._to_sources(source_docs)
             
             logger.info(f"Generated answer with {len(sources)} source documents")
             
@@ -194,23 +291,11 @@ Answer in English:"""
             Tuple of (answer, source_documents)
         """
         try:
-            retriever = self.vectorstore_manager.get_retriever()
+            qa_chain = self._get_session_chain(session_id)
             
-            if retriever is None:
+            if qa_chain is None:
                 return "I don't have any documents to answer from. Please ingest some documents first.", []
             
-            memory = self._get_or_create_memory(session_id)
-            
-            # Create conversational chain with memory
-            qa_chain = ConversationalRetrievalChain.from_llm(
-                llm=self.llm,
-                retriever=retriever,
-                memory=memory,
-                return_source_documents=True,
-                verbose=False,
-                chain_type="stuff"
-            )
-            
             # Query
             result = qa_chain({"question": question})
             
@@ -218,14 +303,7 @@ Answer in English:"""
             source_docs = result.get("source_documents", [])
             
             # Format sources
-            sources = []
-            for doc in source_docs:
-                source = SourceDocument(
-                    content=doc.page_content[:500],
-                    source=doc.metadata.get("source", "unknown"),
-                    page=doc.metadata.get("page", None)
-                )
-                sources.append(source)
+            sources = self._to_sources(source_docs)
             
             return answer, sources
             
@@ -233,8 +311,72 @@ Answer in English:"""
             logger.error(f"Error processing query with memory: {e}")
             raise
     
+    def stream_query(
+        self,
+        question: str,
+        session_id: Optional[str] = None,
+        chat_history: Optional[List[ChatMessage]] = None
+    ) -> Tuple[List[SourceDocument], Iterator[str]]:
+        """
+        Retrieve sources for a question and stream the answer token by token
+        
+        Follows the same steps as the retrieval chain (condense the question
+        against the history, retrieve, answer from the stuffed context), but
+        yields answer tokens as the LLM produces them. With a session_id and
+        no chat_history, the session's memory is used and updated once the
+        answer has been fully streamed.
+        
+        Args:
+            question: User's question
+            session_id: Optional session ID for conversation tracking
+            chat_history: Optional previous chat messages
+            
+        Returns:
+            Tuple of (source_documents, answer token iterator)
+        """
+        memory = None
+        if session_id and not chat_history:
+            memory = self._get_or_create_memory(session_id)
+            history = self._memory_history(memory)
+        else:
+            history = self._format_chat_history(chat_history) if chat_history else []
+        
+        retriever = self.vectorstore_manager.get_retriever()
+        
+        if retriever is None:
+            if memory is None and self.settings.allow_general_knowledge:
+                logger.warning("No documents in vector store, using general knowledge")
+                return [], self.general_knowledge_chain.stream({"question": question})
+            return [], iter(["I don't have any documents to answer from. Please ingest some documents first."])
+        
+        logger.info(f"Processing streaming query: {question[:100]}...")
+        
+        standalone_question = question
+        if history:
+            chat_history_text = "".join(f"\nHuman: {human}\nAssistant: {ai}" for human, ai in history)
+            standalone_question = self.condense_question_chain.invoke({
+                "question": question,
+                "chat_history": chat_history_text
+            })
+        
+        source_docs = retriever.invoke(standalone_question)
+        logger.info(f"Retrieved {len(source_docs)} documents from vector store")
+        context = "\n\n".join(doc.page_content for doc in source_docs)
+        
+        def _tokens() -> Iterator[str]:
+            parts = []
+            for token in self.answer_chain.stream({"context": context, "question": standalone_question}):
+                parts.append(token)
+                yield token
+            
+            if memory is not None:
+                memory.save_context({"question": question}, {"answer": "".join(parts)})
+        
+        return self._to_sources(source_docs), _tokens()
+    
     def clear_session(self, session_id: str):
         """Clear conversation history for a session"""
+        self._session_chains.pop(session_id, None)
         if session_id in self.sessions:
             del self.sessions[session_id]
             logger.info(f"Cleared session: {session_id}")
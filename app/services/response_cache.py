@@ -0,0 +1,144 @@
+"""
+Semantic Response Cache Service
+Reuses chat answers for queries that are semantically equivalent to earlier ones
+"""
+import threading
+import time
+from typing import List, Optional, Tuple
+import numpy as np
+from app.core.config import get_settings
+from app.core.vectorstore import get_vectorstore_manager
+from app.schemas.chat_schema import SourceDocument
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class SemanticResponseCache:
+    """In-process cache of chat answers keyed by query embedding similarity"""
+    
+    def __init__(self):
+        self.settings = get_settings()
+        self.vectorstore_manager = get_vectorstore_manager()
+        self.embeddings = self.vectorstore_manager.embeddings
+        self._lock = threading.Lock()
+        
+        # Unit-normalized query vectors, one row per entry (oldest first)
+        self._vectors: Optional[np.ndarray] = None
+        # (created_at, answer, sources) aligned with the rows of _vectors
+        self._entries: List[Tuple[float, str, List[SourceDocument]]] = []
+        # Vector store revision the cached answers were generated against
+        self._revision = self.vectorstore_manager.revision
+    
+    def embed_query(self, query: str) -> np.ndarray:
+        """
+        Embed a query as a unit-length float32 vector
+        
+        Args:
+            query: User query
+            
+        Returns:
+            Normalized query embedding
+        """
+        vector = np.asarray(self.embeddings.embed_query(query), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+    
+    def _drop_stale_entries(self):
+        """Drop expired entries, or everything if the vector store has changed"""
+        if self._revision != self.vectorstore_manager.revision:
+            if self._entries:
+                logger.info("Vector store changed, clearing semantic response cache")
+            self._vectors = None
+            self._entries = []
+            self._revision = self.vectorstore_manager.revision
+            return
+        
+        # Entries are kept in insertion order, so expired ones form a prefix
+        cutoff = time.monotonic() - self.settings.semantic_cache_ttl
+        expired = 0
+        while expired < len(self._entries) and self._entries[expired][0] < cutoff:
+            expired += 1
+        
+        if expired:
+            self._entries = self._entries[expired:]
+            self._vectors = self._vectors[expired:] if self._entries else None
+    
+    def lookup(self, query_vector: np.ndarray) -> Optional[Tuple[str, List[SourceDocument]]]:
+        """
+        Find a cached answer for a semantically equivalent query
+        
+        Args:
+            query_vector: Normalized query embedding from embed_query
+            
+        Returns:
+            Tuple of (answer, source_documents) on a hit, None otherwise
+        """
+        with self._lock:
+            self._drop_stale_entries()
+            
+            if not self._entries:
+                return None
+            
+            scores = self._vectors @ query_vector
+            best = int(np.argmax(scores))
+            
+            if scores[best] < self.settings.semantic_cache_threshold:
+                return None
+            
+            logger.info(f"Semantic cache hit (similarity {scores[best]:.3f})")
+            _, answer, sources = self._entries[best]
+            return answer, sources
+    
+    def store(self, query_vector: np.ndarray, answer: str, sources: List[SourceDocument], revision: int):
+        """
+        Cache an answer for a query
+        
+        The answer is not cached if the vector store changed while it was being
+        generated, since it may have been built from documents that are gone.
+        
+        Args:
+            query_vector: Normalized query embedding from embed_query
+            answer: Generated answer
+            sources: Source documents used for the answer
+            revision: Vector store revision read before generating the answer
+        """
+        if self.settings.semantic_cache_max_entries <= 0:
+            return
+        
+        with self._lock:
+            if revision != self.vectorstore_manager.revision:
+                logger.debug("Vector store changed while answering, not caching the answer")
+                return
+            
+            self._drop_stale_entries()
+            
+            # Evict the oldest entry when full
+            if len(self._entries) >= self.settings.semantic_cache_max_entries:
+                self._entries = self._entries[1:]
+                self._vectors = self._vectors[1:] if self._entries else None
+            
+            row = query_vector.reshape(1, -1)
+            self._vectors = row if self._vectors is None else np.vstack([self._vectors, row])
+            self._entries.append((time.monotonic(), answer, sources))
+    
+    def clear(self):
+        """Remove all cached answers"""
+        with self._lock:
+            self._vectors = None
+            self._entries = []
+            logger.info("Semantic response cache cleared")
+
+
+# Global response cache instance
+_response_cache: SemanticResponseCache = None
+
+
+def get_response_cache() -> SemanticResponseCache:
+    """Get or create the global SemanticResponseCache instance"""
+    global _response_cache
+    
+    if _response_cache is None:
+        _response_cache = SemanticResponseCache()
+    
+    return _response_cache
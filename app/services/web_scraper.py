@@ -19,6 +19,11 @@ class WebScraperService:
         self.headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
         }
+        
+        # Shared session so repeated scrapes reuse pooled keep-alive connections
+        # instead of paying a new TCP/TLS handshake per request
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
     
     def scrape_url_langchain(self, url: str) -> List[Document]:
         """
@@ -35,7 +40,7 @@ class WebScraperService:
             
             loader = WebBaseLoader(
                 web_paths=[url],
-                header_template=self.headers
+                session=self.session
             )
             
             documents = loader.load()
@@ -65,7 +70,7 @@ class WebScraperService:
         try:
             logger.info(f"Scraping URL with BeautifulSoup: {url}")
             
-            response = requests.get(url, headers=self.headers, timeout=30)
+            response = self.session.get(url, timeout=30)
             response.raise_for_status()
             
             soup = BeautifulSoup(response.content, "html.parser")
@@ -140,7 +145,7 @@ class WebScraperService:
             True if URL is accessible, False otherwise
         """
         try:
-            response = requests.head(url, headers=self.headers, timeout=10, allow_redirects=True)
+            response = self.session.head(url, timeout=10, allow_redirects=True)
             return response.status_code < 400
         except Exception as e:
             logger.warning(f"URL validation failed for {url}: {e}")
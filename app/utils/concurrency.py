@@ -0,0 +1,34 @@
+"""
+Concurrency Utilities
+Bounded worker-thread pools for blocking calls made from async route handlers
+"""
+import os
+from typing import Optional
+import anyio
+from app.core.config import get_settings
+
+
+# Separate limiters so slow ingestion (e.g. scraping) cannot take every
+# thread and leave chat requests queued behind it
+_chat_limiter: Optional[anyio.CapacityLimiter] = None
+_ingest_limiter: Optional[anyio.CapacityLimiter] = None
+
+
+def get_chat_limiter() -> anyio.CapacityLimiter:
+    """Get or create the limiter for blocking chat work (retrieval and LLM calls)"""
+    global _chat_limiter
+    
+    if _chat_limiter is None:
+        _chat_limiter = anyio.CapacityLimiter(get_settings().chat_workers or os.cpu_count() or 1)
+    
+    return _chat_limiter
+
+
+def get_ingest_limiter() -> anyio.CapacityLimiter:
+    """Get or create the limiter for blocking ingestion work (e.g. URL scraping)"""
+    global _ingest_limiter
+    
+    if _ingest_limiter is None:
+        _ingest_limiter = anyio.CapacityLimiter(get_settings().ingest_workers or os.cpu_count() or 1)
+    
+    return _ingest_limiter
@@ -0,0 +1,49 @@
+"""
+Health Endpoint Tests
+Checks that /health reports 503 until the background startup work has finished
+"""
+import threading
+import time
+import pytest
+from fastapi.testclient import TestClient
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from app.core.config import get_settings
+
+
+@pytest.fixture
+def main_module(tmp_path, monkeypatch):
+    """Import the app against a temporary index and documents folder with a fake embedding model"""
+    monkeypatch.setenv("FAISS_INDEX_PATH", str(tmp_path / "faiss_index"))
+    monkeypatch.setenv("DOCUMENTS_FOLDER", str(tmp_path / "documents"))
+    monkeypatch.setenv("WARMUP_ON_STARTUP", "true")
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    get_settings.cache_clear()
+
+    from app import main
+    from app.core import vectorstore
+
+    embeddings = DeterministicFakeEmbedding(size=16)
+    monkeypatch.setattr(main, "get_embeddings", lambda: embeddings)
+    monkeypatch.setattr(vectorstore, "get_embeddings", lambda: embeddings)
+    yield main
+    get_settings.cache_clear()
+
+
+def test_health_is_503_until_startup_work_finishes(main_module, monkeypatch):
+    release_warmup = threading.Event()
+    monkeypatch.setattr(main_module, "_warmup_models", lambda: release_warmup.wait(10))
+
+    with TestClient(main_module.app) as client:
+        response = client.get("/health")
+        assert response.status_code == 503
+        assert response.json()["status"] == "starting"
+
+        release_warmup.set()
+        deadline = time.monotonic() + 10
+        while client.get("/health").status_code != 200 and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+        response = client.get("/health")
+        assert response.status_code == 200
+        assert response.json()["ready"] is True
+        assert response.json()["ingest"] == "completed"
@@ -0,0 +1,78 @@
+"""
+Vector Store Tests
+Checks that FAISS_MMAP serves the loaded index from a memory mapping
+"""
+import sys
+from pathlib import Path
+import pytest
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from app.core import vectorstore as vectorstore_module
+from app.core.config import get_settings
+
+pytestmark = pytest.mark.skipif(
+    not sys.platform.startswith("linux"),
+    reason="Reads memory mappings from /proc/self/maps"
+)
+
+
+def _is_mapped(file_path: Path) -> bool:
+    """Whether a file is memory-mapped into this process"""
+    with open("/proc/self/maps") as maps:
+        return any(line.rstrip().endswith(str(file_path)) for line in maps)
+
+
+@pytest.fixture
+def make_manager(tmp_path, monkeypatch):
+    """Build VectorStoreManagers over a temporary index with a fake embedding model"""
+    monkeypatch.setenv("FAISS_INDEX_PATH", str(tmp_path / "faiss_index"))
+    monkeypatch.setenv("FAISS_MMAP", "true")
+    monkeypatch.setenv("FAISS_FLUSH_INTERVAL", "0")
+    monkeypatch.delenv("FAISS_INDEX_FACTORY", raising=False)
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    embeddings = DeterministicFakeEmbedding(size=64)
+    monkeypatch.setattr(vectorstore_module, "get_embeddings", lambda: embeddings)
+    get_settings.cache_clear()
+
+    def _make(index_factory=None):
+        if index_factory:
+            monkeypatch.setenv("FAISS_INDEX_FACTORY", index_factory)
+            get_settings.cache_clear()
+        return vectorstore_module.VectorStoreManager()
+
+    yield _make
+    get_settings.cache_clear()
+
+
+def _documents(count: int):
+    return [
+        Document(page_content=f"document number {i}", metadata={"source": f"doc{i % 10}.txt"})
+        for i in range(count)
+    ]
+
+
+@pytest.mark.parametrize("index_factory", [None, "IVF4,Flat"])
+def test_mmap_load_is_backed_by_index_file(make_manager, index_factory):
+    writer = make_manager(index_factory)
+    writer.add_documents(_documents(200))
+    index_file = writer.index_path / "index.faiss"
+    expected = [doc.page_content for doc in writer.similarity_search("document number 7", k=3)]
+    del writer
+
+    reader = make_manager()
+
+    assert reader._index_mmapped
+    assert _is_mapped(index_file)
+    assert [doc.page_content for doc in reader.similarity_search("document number 7", k=3)] == expected
+
+
+def test_flat_index_vectors_are_not_copied_into_ram(make_manager):
+    writer = make_manager()
+    writer.add_documents(_documents(50))
+    del writer
+
+    reader = make_manager()
+    index = vectorstore_module.faiss.downcast_index(reader.vectorstore.index)
+
+    # IO_FLAG_MMAP would give the flat index its own (owned) copy of the vectors
+    assert not index.codes.is_owned